@@ -6,6 +6,9 @@ import requests
 LIMIT = 250
 INITIAL_ID = 3197873
 
+# Shared session, so that queries reuse pooled connections
+session = requests.Session()
+
 
 def _get_txs_legacy(wallet_address, from_id):
     query_params = {
@@ -15,7 +18,7 @@ def _get_txs_legacy(wallet_address, from_id):
     url = f"https://api.cosmostation.io/v1/account/new_txs/{wallet_address}"
 
     logging.info("Requesting url=%s", url)
-    response = requests.get(url, query_params)
+    response = session.get(url, params=query_params)
     data = response.json()
     time.sleep(1)
 
@@ -38,7 +41,7 @@ def get_tx(txid):
     url = f"https://api.cosmostation.io/v1/tx/hash/{txid}"
 
     logging.info("Requesting url=%s", url)
-    response = requests.get(url)
+    response = session.get(url)
     data = response.json()
     time.sleep(1)
 
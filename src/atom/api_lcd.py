@@ -12,11 +12,14 @@ Docs: https://v1.cosmos.network/rpc/
 
 LIMIT_PER_QUERY = 50
 
+# Shared session, so that queries reuse pooled connections
+session = requests.Session()
+
 
 def _query(uri_path, query_params, sleep_seconds=1):
     url = f"{ATOM_NODE}{uri_path}"
     logging.info("Requesting url %s?%s", url, urlencode(query_params))
-    response = requests.get(url, query_params)
+    response = session.get(url, params=query_params)
 
     time.sleep(sleep_seconds)
     return response.json()
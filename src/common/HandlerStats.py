@@ -0,0 +1,26 @@
+import logging
+
+
+class HandlerStats:
+    """ Hit counts and total processing time per transaction handler """
+
+    hits = {}
+    seconds = {}
+
+    @classmethod
+    def record(cls, handler_name, seconds):
+        cls.hits[handler_name] = cls.hits.get(handler_name, 0) + 1
+        cls.seconds[handler_name] = cls.seconds.get(handler_name, 0) + seconds
+
+    @classmethod
+    def log(cls, ticker, wallet_address):
+        if len(cls.hits) > 0:
+            data = {
+                "ticker": ticker,
+                "wallet_address": wallet_address,
+                "handler_hits": cls.hits,
+                "handler_seconds": {k: round(v, 3) for k, v in cls.seconds.items()},
+                "RLOG": 1,
+                "event": "job_handler_stats"
+            }
+            logging.info(data)
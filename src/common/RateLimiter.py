@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+
+
+class RateLimiter:
+    """ Thread-safe token bucket limiter with AIMD (additive increase, multiplicative decrease) rate.
+
+    The rate (requests/second) increases by `increase` after each successful request, up to `max_rate`.  It is cut
+    by `decrease` after a rate limit response or a response slower than `max_latency` seconds, down to `min_rate`.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, rate, min_rate=0.5, max_rate=None, increase=0.1, decrease=0.5, max_latency=10.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate else rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_latency = max_latency
+
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.slow_responses = 0
+        self.seconds_throttled = 0.0
+
+    @classmethod
+    def for_key(cls, key, *args, **kwargs):
+        """ Returns shared limiter for key (i.e. node url), creating it on first use """
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(*args, **kwargs)
+            return cls._instances[key]
+
+    def acquire(self, n=1):
+        """ Blocks until n requests (i.e. calls of a JSON-RPC batch) are allowed under the current rate """
+        with self._lock:
+            now = time.monotonic()
+            burst = max(1.0, self.rate)
+            self._tokens = min(burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            # Reserve tokens; wait for the deficit (if any) outside the lock
+            self._tokens -= n
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+            self.requests += n
+            self.seconds_throttled += wait
+
+        if wait:
+            time.sleep(wait)
+
+    def on_success(self, latency):
+        with self._lock:
+            if self.max_latency and latency > self.max_latency:
+                self.slow_responses += 1
+                self._decrease()
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_rate_limited(self):
+        with self._lock:
+            self.rate_limited += 1
+            self._decrease()
+
+    def on_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def _decrease(self):
+        # Decrease at most once per second, so a burst of in-flight failures counts as one signal
+        now = time.monotonic()
+        if now - self._last_decrease < 1:
+            return
+        self._last_decrease = now
+
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        logging.info("Reduced request rate to %.2f/s", self.rate)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": round(self.rate, 2),
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "slow_responses": self.slow_responses,
+                "seconds_throttled": round(self.seconds_throttled, 2),
+            }
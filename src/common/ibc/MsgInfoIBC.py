@@ -22,9 +22,10 @@ class MsgInfoIBC:
         self.message = message
         self.msg_type = self._msg_type(message)
         self.log = log
-        self.transfers = self._transfers()
+        self.events_by_type = MsgInfoIBC._events_by_type(log)
         self.transfers_event = self._transfers_transfer_event(show_addrs=True)
-        self.wasm = MsgInfoIBC.wasm(log)
+        self.transfers = self._transfers()
+        self.wasm = MsgInfoIBC.wasm(log, self.events_by_type)
         self.contract = self._contract(message)
 
     def _msg_type(self, message):
@@ -38,63 +39,62 @@ class MsgInfoIBC:
             raise Exception("Unexpected message: {}".format(message))
         return last_field
 
+    @classmethod
+    def _events_by_type(cls, log):
+        """ Returns dict of <event type> -> list of attributes lists (one per event of that type, in log order) """
+        out = {}
+        for event in log["events"]:
+            event_type, attributes = event["type"], event["attributes"]
+            if event_type in out:
+                out[event_type].append(attributes)
+            else:
+                out[event_type] = [attributes]
+        return out
+
     def _has_coin_spent_received(self):
-        return self._has_event_type(COIN_SPENT) and self._has_event_type(COIN_SPENT)
+        return self._has_event_type(COIN_SPENT)
 
     def _transfers(self):
         """
         Parses log element and returns (list of inbound transfers, list of outbound transfers),
         relative to wallet_address.
         """
-        transfers_in = self._transfers_coin_received()
-        transfers_out = self._transfers_coin_spent()
-
         if not self._has_coin_spent_received():
             # Only add "transfer" event if "coin_received"/"coin_spent" events do not exist
-            transfers_in, transfers_out = self._transfers_transfer_event()
+            transfers_in, transfers_out = self.transfers_event
+            return [t[:2] for t in transfers_in], [t[:2] for t in transfers_out]
 
+        transfers_in = self._transfers_coin_received()
+        transfers_out = self._transfers_coin_spent()
         return transfers_in, transfers_out
 
     def _has_event_type(self, target_event_type):
-        events = self.log["events"]
-        for event in events:
-            event_type, attributes = event["type"], event["attributes"]
-            if event_type == target_event_type:
-                return True
-        return False
+        return target_event_type in self.events_by_type
 
     def _transfers_coin_received(self):
         transfers_in = []
 
-        events = self.log["events"]
-        for event in events:
-            event_type, attributes = event["type"], event["attributes"]
-
-            if event_type == COIN_RECEIVED:
-                for i in range(0, len(attributes), 2):
-                    receiver = attributes[i]["value"]
-                    amount_string = attributes[i + 1]["value"]
-                    if receiver == self.wallet_address:
-                        for amount, currency in MsgInfoIBC.amount_currency(amount_string):
-                            transfers_in.append((amount, currency))
+        for attributes in self.events_by_type.get(COIN_RECEIVED, []):
+            for i in range(0, len(attributes), 2):
+                receiver = attributes[i]["value"]
+                amount_string = attributes[i + 1]["value"]
+                if receiver == self.wallet_address:
+                    for amount, currency in MsgInfoIBC.amount_currency(amount_string):
+                        transfers_in.append((amount, currency))
 
         return transfers_in
 
     def _transfers_coin_spent(self):
         transfers_out = []
 
-        events = self.log["events"]
-        for event in events:
-            event_type, attributes = event["type"], event["attributes"]
-
-            if event_type == COIN_SPENT:
-                for i in range(0, len(attributes), 2):
-                    spender = attributes[i]["value"]
-                    amount_string = attributes[i + 1]["value"]
+        for attributes in self.events_by_type.get(COIN_SPENT, []):
+            for i in range(0, len(attributes), 2):
+                spender = attributes[i]["value"]
+                amount_string = attributes[i + 1]["value"]
 
-                    if spender == self.wallet_address:
-                        for amount, currency in MsgInfoIBC.amount_currency(amount_string):
-                            transfers_out.append((amount, currency))
+                if spender == self.wallet_address:
+                    for amount, currency in MsgInfoIBC.amount_currency(amount_string):
+                        transfers_out.append((amount, currency))
 
         return transfers_out
 
@@ -103,33 +103,29 @@ class MsgInfoIBC:
             using transfer event element only. """
         transfers_in, transfers_out = [], []
 
-        events = self.log["events"]
-        for event in events:
-            event_type, attributes = event["type"], event["attributes"]
-
-            if event_type == "transfer":
-                # ignore MsgMultiSend case (uses different format)
-                if self.msg_type == co.MSG_TYPE_MULTI_SEND:
-                    continue
-
-                # Handle all other cases
-                for i in range(0, len(attributes), 3):
-                    recipient = attributes[i]["value"]
-                    sender = attributes[i + 1]["value"]
-                    amount_string = attributes[i + 2]["value"]
-
-                    if recipient == self.wallet_address:
-                        for amount, currency in MsgInfoIBC.amount_currency(amount_string):
-                            if show_addrs:
-                                transfers_in.append((amount, currency, sender, recipient))
-                            else:
-                                transfers_in.append((amount, currency))
-                    elif sender == self.wallet_address:
-                        for amount, currency in MsgInfoIBC.amount_currency(amount_string):
-                            if show_addrs:
-                                transfers_out.append((amount, currency, sender, recipient))
-                            else:
-                                transfers_out.append((amount, currency))
+        # ignore MsgMultiSend case (uses different format)
+        if self.msg_type == co.MSG_TYPE_MULTI_SEND:
+            return transfers_in, transfers_out
+
+        # Handle all other cases
+        for attributes in self.events_by_type.get("transfer", []):
+            for i in range(0, len(attributes), 3):
+                recipient = attributes[i]["value"]
+                sender = attributes[i + 1]["value"]
+                amount_string = attributes[i + 2]["value"]
+
+                if recipient == self.wallet_address:
+                    for amount, currency in MsgInfoIBC.amount_currency(amount_string):
+                        if show_addrs:
+                            transfers_in.append((amount, currency, sender, recipient))
+                        else:
+                            transfers_in.append((amount, currency))
+                elif sender == self.wallet_address:
+                    for amount, currency in MsgInfoIBC.amount_currency(amount_string):
+                        if show_addrs:
+                            transfers_out.append((amount, currency, sender, recipient))
+                        else:
+                            transfers_out.append((amount, currency))
         return transfers_in, transfers_out
 
     @classmethod
@@ -201,38 +197,37 @@ class MsgInfoIBC:
         return val
 
     @classmethod
-    def wasm(cls, log):
+    def wasm(cls, log, events_by_type=None):
         """ Parses wasm in log to return list of action dictionaries. """
+        if events_by_type is None:
+            events_by_type = cls._events_by_type(log)
+        if "wasm" not in events_by_type:
+            return []
 
-        events = log["events"]
-        for event in events:
-            attributes, event_type = event["attributes"], event["type"]
+        # first wasm event only
+        attributes = events_by_type["wasm"][0]
+        actions = []
+        action = {}
 
-            if event_type == "wasm":
-                actions = []
-                action = {}
-
-                for kv in attributes:
-                    k, v = kv["key"], kv["value"]
-
-                    if k == "contract_address":
-                        # reached beginning of next action
-
-                        # add previous action to list
-                        if len(action):
-                            actions.append(action)
+        for kv in attributes:
+            k, v = kv["key"], kv["value"]
 
-                        # start new action
-                        action = {}
-                        action["contract_address"] = v
-                    else:
-                        action[k] = v
+            if k == "contract_address":
+                # reached beginning of next action
 
+                # add previous action to list
                 if len(action):
                     actions.append(action)
-                return actions
 
-        return []
+                # start new action
+                action = {}
+                action["contract_address"] = v
+            else:
+                action[k] = v
+
+        if len(action):
+            actions.append(action)
+        return actions
 
     def _contract(self, message):
         if message and "contract" in message:
@@ -1,6 +1,8 @@
 import logging
 import math
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlencode
 
 import requests
@@ -13,23 +15,42 @@ from common.ibc.api_common import (
     TXS_LIMIT_PER_QUERY,
     remove_duplicates,
 )
+from common.ibc.denom_registry import DenomRegistry
 from settings_csv import REPORTS_DIR
 
+MAX_CONCURRENT_QUERIES_PER_NODE = 4
+DENOM_TRACES_LIMIT_PER_QUERY = 1000
+
 
 class LcdAPI:
     session = requests.Session()
     debug = False
+    semaphores = {}
+    semaphores_lock = threading.Lock()
+    chains = {}  # node -> chain id
+    denom_traces_loaded = set()  # chains whose denom traces were bulk loaded by this process
+    denom_traces_lock = threading.Lock()
 
     def __init__(self, node):
         self.node = node
 
+    def _semaphore(self):
+        """ Returns semaphore limiting concurrent queries to this node """
+        with LcdAPI.semaphores_lock:
+            if self.node not in LcdAPI.semaphores:
+                LcdAPI.semaphores[self.node] = threading.BoundedSemaphore(MAX_CONCURRENT_QUERIES_PER_NODE)
+            return LcdAPI.semaphores[self.node]
+
     def _query(self, uri_path, query_params, sleep_seconds=0):
         url = f"{self.node}{uri_path}"
-        logging.info("Requesting url %s?%s ...", url, urlencode(query_params))
-        response = self.session.get(url, params=query_params)
 
-        if sleep_seconds:
-            time.sleep(sleep_seconds)
+        # Sleep while holding semaphore, so that each concurrent slot is rate-limited
+        with self._semaphore():
+            logging.info("Requesting url %s?%s ...", url, urlencode(query_params))
+            response = self.session.get(url, params=query_params)
+
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
         return response.json()
 
     def get_tx(self, txid):
@@ -95,8 +116,36 @@ class LcdAPI:
     def get_ibc_symbol(self, ibc_address):
         data = self._get_ibc_symbol(ibc_address)
         denom = data["denom_trace"]["base_denom"]
-        symbol = denom[1:].upper()  # i.e. "uosmo" -> "OSMO"
-        return symbol
+        return _symbol(denom)
+
+    def get_denom_trace(self, ibc_address):
+        """ Returns (path, base_denom) of ibc address """
+        data = self._get_ibc_symbol(ibc_address)
+        denom_trace = data["denom_trace"]
+        return denom_trace["path"], denom_trace["base_denom"]
+
+    def get_denom_traces(self):
+        """ Returns list of (path, base_denom) for all denom traces on chain """
+        uri_path = "/ibc/apps/transfer/v1/denom_traces"
+        out = []
+        next_key = None
+        while True:
+            query_params = {"pagination.limit": DENOM_TRACES_LIMIT_PER_QUERY}
+            if next_key:
+                query_params["pagination.key"] = next_key
+            data = self._query(uri_path, query_params, sleep_seconds=1)
+
+            for denom_trace in data["denom_traces"]:
+                out.append((denom_trace["path"], denom_trace["base_denom"]))
+
+            next_key = data["pagination"]["next_key"]
+            if not next_key:
+                return out
+
+    def chain_id(self):
+        uri_path = "/cosmos/base/tendermint/v1beta1/node_info"
+        data = self._query(uri_path, {})
+        return data["default_node_info"]["network"]
 
     def balances(self, wallet_address, height=None):
         uri_path = "/cosmos/bank/v1beta1/balances/{}".format(wallet_address)
@@ -107,58 +156,168 @@ class LcdAPI:
         return data
 
 
-def get_txs_all(node, wallet_address, progress, max_txs, limit=TXS_LIMIT_PER_QUERY, sleep_seconds=1,
-                debug=False, stage_name="default", events_types=None):
-    LcdAPI.debug = debug
-    api = LcdAPI(node)
-    events_types = events_types if events_types else EVENTS_TYPE_LIST_DEFAULT
-    max_pages = math.ceil(max_txs / limit)
+class LcdTxsSession:
+    """ Fetches transactions for one wallet/node.  First page of each events type is fetched once, and used for both
+    the progress estimate (pages_count()) and the transactions result (get_txs_all()).
+    """
+
+    def __init__(self, node, wallet_address, max_txs, limit=TXS_LIMIT_PER_QUERY, debug=False, events_types=None):
+        LcdAPI.debug = debug
+        self.api = LcdAPI(node)
+        self.wallet_address = wallet_address
+        self.max_txs = max_txs
+        self.limit = limit
+        self.events_types = events_types if events_types else EVENTS_TYPE_LIST_DEFAULT
+        self.first_pages = None
+
+    def _get_first_pages(self, sleep_seconds=0):
+        """ Returns list of (elems, next_offset, total_count_txs) for first page of each events type """
+        if self.first_pages is None:
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES_PER_NODE) as executor:
+                self.first_pages = list(executor.map(
+                    lambda events_type: self.api.get_txs(
+                        self.wallet_address, events_type, 0, self.limit, sleep_seconds),
+                    self.events_types))
+        return self.first_pages
+
+    def pages_count(self):
+        total_pages = 0
+        for event_type, (_, _, num_txs) in zip(self.events_types, self._get_first_pages()):
+            num_txs = min(num_txs, self.max_txs)
+            num_pages = math.ceil(num_txs / self.limit) if num_txs else 1
+
+            logging.info("event_type: %s, num_txs: %s, num_pages: %s", event_type, num_txs, num_pages)
+            total_pages += num_pages
+
+        return total_pages
+
+    def get_txs_all(self, progress, sleep_seconds=1, stage_name="default"):
+        max_pages = math.ceil(self.max_txs / self.limit)
+
+        if self.first_pages is None:
+            progress.report(1, f"Fetching first page for {', '.join(self.events_types)} ...", stage_name)
+        first_pages = self._get_first_pages(sleep_seconds)
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES_PER_NODE) as executor:
+            # Remaining pages of all events types (total count from first page determines number of pages)
+            futures = {}
+            for events_type, (_, next_offset, total_count_txs) in zip(self.events_types, first_pages):
+                if next_offset is None:
+                    continue
+                num_pages = min(max_pages, math.ceil(total_count_txs / self.limit))
+                for page in range(1, num_pages):
+                    future = executor.submit(
+                        self.api.get_txs, self.wallet_address, events_type, page * self.limit, self.limit,
+                        sleep_seconds)
+                    futures[future] = (events_type, page)
+
+            pages = {}
+            page_for_progress = len(self.events_types)
+            for future in as_completed(futures):
+                page_for_progress += 1
+                events_type, page = futures[future]
+                progress.report(page_for_progress, f"Fetched page {page + 1} for {events_type} ...", stage_name)
+
+                elems, _, _ = future.result()
+                pages[(events_type, page)] = elems
+
+        out = []
+        for events_type, (elems, _, _) in zip(self.events_types, first_pages):
+            pages[(events_type, 0)] = elems
+            page = 1
+            while (events_type, page) in pages:
+                page += 1
+
+            # Total count can be missing or stale on some nodes: keep paging while last page is full
+            while page < max_pages and len(pages[(events_type, page - 1)]) == self.limit:
+                page_for_progress += 1
+                progress.report(page_for_progress, f"Fetching page {page + 1} for {events_type} ...", stage_name)
+
+                elems, _, _ = self.api.get_txs(
+                    self.wallet_address, events_type, page * self.limit, self.limit, sleep_seconds)
+                pages[(events_type, page)] = elems
+                page += 1
+
+            # Combine pages in order of events type, page
+            for i in range(page):
+                out.extend(pages[(events_type, i)])
+
+        out = remove_duplicates(out)
+        return out
 
-    out = []
-    page_for_progress = 1
-    for events_type in events_types:
-        offset = 0
 
-        for _ in range(0, max_pages):
-            message = f"Fetching page {page_for_progress} for {events_type} ..."
-            progress.report(page_for_progress, message, stage_name)
-            page_for_progress += 1
-
-            elems, offset, _ = api.get_txs(wallet_address, events_type, offset, limit, sleep_seconds)
-
-            out.extend(elems)
-            if offset is None:
-                break
-
-    out = remove_duplicates(out)
-    return out
+def get_txs_all(node, wallet_address, progress, max_txs, limit=TXS_LIMIT_PER_QUERY, sleep_seconds=1,
+                debug=False, stage_name="default", events_types=None):
+    session = LcdTxsSession(node, wallet_address, max_txs, limit, debug, events_types)
+    return session.get_txs_all(progress, sleep_seconds, stage_name)
 
 
 def get_txs_pages_count(node, address, max_txs, limit=TXS_LIMIT_PER_QUERY, debug=False,
                         events_types=None):
-    LcdAPI.debug = debug
-    api = LcdAPI(node)
-    events_types = events_types if events_types else EVENTS_TYPE_LIST_DEFAULT
-
-    total_pages = 0
-    for event_type in events_types:
-        # Number of queries for events message.sender
-        _, _, num_txs = api.get_txs(address, event_type, offset=0, limit=limit, sleep_seconds=0)
-        num_txs = min(num_txs, max_txs)
-        num_pages = math.ceil(num_txs / limit) if num_txs else 1
-
-        logging.info("event_type: %s, num_txs: %s, num_pages: %s", event_type, num_txs, num_pages)
-        total_pages += num_pages
-
-    return total_pages
+    session = LcdTxsSession(node, address, max_txs, limit, debug, events_types)
+    return session.pages_count()
 
 
 def get_ibc_ticker(node, ibc_address, cache_ibc_addresses=None):
     if cache_ibc_addresses is not None and ibc_address in cache_ibc_addresses:
         return cache_ibc_addresses[ibc_address]
 
-    symbol = LcdAPI(node).get_ibc_symbol(ibc_address)
+    symbol = _symbol(_denom_trace(node, ibc_address)[1])
 
     if cache_ibc_addresses is not None:
         cache_ibc_addresses[ibc_address] = symbol
     return symbol
+
+
+def _symbol(denom):
+    return denom[1:].upper()  # i.e. "uosmo" -> "OSMO"
+
+
+def _denom_trace(node, ibc_address):
+    """ Returns (path, base_denom) of ibc address, from local denom registry if possible.
+
+    On first registry miss for a chain (per process), loads all denom traces of the chain in bulk.  Falls back to
+    querying the single denom trace.
+    """
+    _, hash = ibc_address.split("/")
+    chain = _chain(node)
+
+    trace = DenomRegistry.get(chain, hash)
+    if trace:
+        return trace
+
+    with LcdAPI.denom_traces_lock:
+        if chain not in LcdAPI.denom_traces_loaded:
+            LcdAPI.denom_traces_loaded.add(chain)
+            try:
+                traces = LcdAPI(node).get_denom_traces()
+                DenomRegistry.add_many(chain, traces)
+                logging.info("Loaded %s denom traces for chain=%s", len(traces), chain)
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning("Unable to load denom traces for chain=%s, exception=%s", chain, str(e))
+
+            trace = DenomRegistry.get(chain, hash)
+            if trace:
+                return trace
+
+    trace = LcdAPI(node).get_denom_trace(ibc_address)
+    DenomRegistry.add_many(chain, [trace])
+    return trace
+
+
+def _chain(node):
+    """ Returns chain id of node (or node itself, if chain id is unavailable) """
+    if node in LcdAPI.chains:
+        return LcdAPI.chains[node]
+
+    chain = DenomRegistry.get_chain(node)
+    if not chain:
+        try:
+            chain = LcdAPI(node).chain_id()
+            DenomRegistry.set_chain(node, chain)
+        except (KeyError, TypeError, ValueError) as e:
+            logging.warning("Unable to get chain id for node=%s, exception=%s", node, str(e))
+            chain = node
+
+    LcdAPI.chains[node] = chain
+    return chain
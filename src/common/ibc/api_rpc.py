@@ -1,6 +1,6 @@
 import ast
 import base64
-import functools
+import json
 import logging
 import math
 import time
@@ -14,6 +14,7 @@ from common.ibc.api_common import (
     EVENTS_TYPE_SIGNER,
     remove_duplicates,
 )
+from common.ibc.block_times import BlockTimeCache
 from common.ibc.protobuf_decoder import CosmosTransactionFeeExtractor, ProtobufParser, ProtobufParserCallback
 from dateutil import parser
 from fet.fetchhub1.api_rpc import TXS_LIMIT_PER_QUERY
@@ -35,14 +36,6 @@ class RpcAPI:
             time.sleep(sleep_seconds)
         return response.json()
 
-    def _block(self, height):
-        uri_path = "/block"
-        query_params = {"height": height}
-
-        data = self._query(uri_path, query_params, sleep_seconds=0.2)
-
-        return data
-
     def _txs_search(self, wallet_address, events_type, page, per_page):
         uri_path = "/tx_search"
         query_params = {"page": page, "per_page": per_page}
@@ -80,11 +73,8 @@ class RpcAPI:
 
         return elems, next_page, total_count_pages, total_count_txs
 
-    @functools.lru_cache
     def block_time(self, height):
-        data = self._block(height)
-
-        return data["result"]["block"]["header"]["time"]
+        return BlockTimeCache.get(self.node, height)
 
 
 def get_txs_all(node, wallet_address, progress, max_txs, limit=TXS_LIMIT_PER_QUERY, debug=False,
@@ -134,71 +124,86 @@ def normalize_rpc_txns(node, elems):
     """
     Normalize the RPC transaction element to have fields a LCD transaction element
     would have.
-    Decodes base64 encoded fields as needed.
+    Decodes base64 encoded fields as needed.  Event attributes in tx_result are left base64 encoded (not read by
+    processors, which use the decoded log).
     """
+    # Fetch block times of all transactions in bulk
+    block_times = BlockTimeCache.prefill(node, [elem["height"] for elem in elems])
+
     for elem in elems:
-        elem = _decode(elem)
+        log, fee = _decode(elem["tx_result"]["log"], elem["tx"])
+        elem["tx_result"]["log"] = log
 
         # add the txhash field
         elem["txhash"] = elem["hash"]
 
         # add the timestamp field
-        _add_timestamp_from_block_time(elem, node)
+        _add_timestamp_from_block_time(elem, block_times)
 
         # add the fee
-        _add_fee_from_cosmos_transaction_authinfo(elem)
+        _add_fee(elem, fee)
 
         # add transaction messages
         _add_messages_from_logs(elem)
 
 
-def _decode(elem):
-    """ Modifies transaction data with decoded version """
-    elem["tx_result"]["log"] = ast.literal_eval(elem["tx_result"]["log"])
-
-    events = elem["tx_result"]["events"]
-    for event in events:
-        for kv in event["attributes"]:
-            k, v = kv["key"], kv["value"]
+def _decode(log, tx):
+    """ Returns (decoded log, (fee denom, fee amount)) of transaction """
+    return parse_log(log), _fee_from_cosmos_transaction_authinfo(base64.b64decode(tx))
 
-            kv["key"] = base64.b64decode(k).decode()
-            kv["value"] = base64.b64decode(v).decode()
 
-    elem["tx"] = base64.b64decode(elem["tx"])
+def parse_log(log):
+    """ Returns decoded tx_result.log string (JSON; falls back to python literal parsing for any log that is not) """
+    try:
+        return json.loads(log)
+    except ValueError:
+        return ast.literal_eval(log)
 
-    return elem
 
-
-def _add_timestamp_from_block_time(elem, node):
+def _add_timestamp_from_block_time(elem, block_times):
     """
-    Add a timestamp field to an RPC element.
+    Add a timestamp field to an RPC element (block_times: dict of height -> block time).
     """
     # since there isn't a timestamp on the RPC transaction data, we
     # need to get the timestamp based on the block processing time
     # it's also converted from the RPC format to the LCD format:
     #     i.e. "2021-08-26T21:08:44.86954814Z" -> "2021-08-26T21:08:44Z"
     height = elem["height"]
-    block_timestamp = RpcAPI(node).block_time(height)
-    block_timestamp = parser.parse(block_timestamp).strftime("%Y-%m-%dT%H:%M:%SZ")
-    elem["timestamp"] = block_timestamp
+    block_timestamp = block_times[int(height)]
+    elem["timestamp"] = _lcd_timestamp(block_timestamp)
+
 
+def _lcd_timestamp(block_timestamp):
+    # Fast path for UTC timestamps (the format tendermint uses)
+    if len(block_timestamp) >= 20 and block_timestamp[10] == "T" and block_timestamp[19] in ".Z" \
+            and block_timestamp.endswith("Z"):
+        return block_timestamp[:19] + "Z"
+    return parser.parse(block_timestamp).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-def _add_fee_from_cosmos_transaction_authinfo(elem):
+
+def _fee_from_cosmos_transaction_authinfo(tx):
     """
-    Extracts the fee denom and amount from the protobuf encoded cosmos transaction data and
-    adds it to the RPC element.
+    Returns (fee denom, fee amount) extracted from the protobuf encoded cosmos transaction data.
     """
     fee_extractor_callback = CosmosTransactionFeeExtractor()
-    protobuf_parser = ProtobufParser(elem["tx"], fee_extractor_callback)
+    protobuf_parser = ProtobufParser(tx, fee_extractor_callback)
     protobuf_parser.parse()
 
+    return fee_extractor_callback.fee_denom, fee_extractor_callback.fee_amount
+
+
+def _add_fee(elem, fee):
+    """
+    Adds the fee (denom, amount) to the RPC element in the LCD format.
+    """
+    fee_denom, fee_amount = fee
     elem["tx"] = {
         "auth_info": {
             "fee": {
                 "amount": [
                     {
-                        "denom": fee_extractor_callback.fee_denom,
-                        "amount": fee_extractor_callback.fee_amount
+                        "denom": fee_denom,
+                        "amount": fee_amount
                     }
                 ]
             }
@@ -0,0 +1,57 @@
+"""
+usage: python3 -m common.ibc.bench_protobuf [<tx_search_response.json> ...] [--repeat N]
+
+Microbenchmark for common.ibc.protobuf_decoder.  Extracts the fee (CosmosTransactionFeeExtractor) from the base64 "tx"
+blobs of recorded RPC /tx_search responses and prints per-tx parse time.  Defaults to responses recorded by a previous
+--debug run (_reports/debug.txssearch-*.json).  Run before/after a decoder change to compare.
+"""
+
+import argparse
+import base64
+import glob
+import json
+import statistics
+import time
+
+from common.ibc.protobuf_decoder import CosmosTransactionFeeExtractor, ProtobufParser
+from settings_csv import REPORTS_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = args.paths if args.paths else sorted(glob.glob(f"{REPORTS_DIR}/debug.txssearch-*.json"))
+    blobs = _load_blobs(paths)
+    if not blobs:
+        print(f"No recorded transactions found in {REPORTS_DIR}.  Run report_fet.py with --debug first.")
+        return
+
+    timings = []
+    for blob in blobs:
+        time_start = time.perf_counter()
+        for _ in range(args.repeat):
+            ProtobufParser(blob, CosmosTransactionFeeExtractor()).parse()
+        timings.append((time.perf_counter() - time_start) / args.repeat)
+
+    print(f"transactions: {len(blobs)}")
+    print(f"mean tx size:  {statistics.mean(len(blob) for blob in blobs):.0f} bytes")
+    print(f"per-tx mean:   {statistics.mean(timings) * 1e6:.1f} us")
+    print(f"per-tx median: {statistics.median(timings) * 1e6:.1f} us")
+    print(f"per-tx max:    {max(timings) * 1e6:.1f} us")
+
+
+def _load_blobs(paths):
+    out = []
+    for path in paths:
+        with open(path, "r") as f:
+            data = json.load(f)
+        for elem in data["result"]["txs"]:
+            out.append(base64.b64decode(elem["tx"]))
+    return out
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Process-wide store of (rpc node, block height) -> block time, for Tendermint RPC nodes.
+
+Missing heights are fetched in bulk via /blockchain, which returns up to BLOCKCHAIN_MAX_HEADERS block headers per
+query.  Set IBC_BLOCK_TIMES_DB to a file path to persist block times across runs (in memory only otherwise).
+Set BlockTimeCache.debug to record/replay node responses (see use_debug_files).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from common.debug_util import use_debug_files
+from settings_csv import IBC_BLOCK_TIMES_DB, REPORTS_DIR
+
+BLOCKCHAIN_MAX_HEADERS = 20  # max block headers returned by /blockchain per query
+MAX_VARIABLES_PER_QUERY = 500
+
+
+class BlockTimeCache:
+
+    path = IBC_BLOCK_TIMES_DB if IBC_BLOCK_TIMES_DB else ":memory:"
+    conn = None
+    lock = threading.Lock()
+    session = requests.Session()
+    debug = False
+
+    @classmethod
+    def _conn(cls):
+        if cls.conn is None:
+            cls.conn = sqlite3.connect(cls.path, check_same_thread=False, timeout=30)
+            if cls.path != ":memory:":
+                # WAL mode allows concurrent readers while another process appends
+                cls.conn.execute("PRAGMA journal_mode=WAL")
+            cls.conn.execute(
+                "CREATE TABLE IF NOT EXISTS block_times (node TEXT, height INTEGER, time TEXT, "
+                "PRIMARY KEY (node, height)) WITHOUT ROWID")
+        return cls.conn
+
+    @classmethod
+    def get(cls, node, height):
+        """ Returns block time of height (i.e. "2021-08-26T21:08:44.86954814Z"), fetching it if not stored """
+        height = int(height)
+        return cls.prefill(node, [height]).get(height)
+
+    @classmethod
+    def get_many(cls, node, heights):
+        """ Returns dict of height -> block time for heights found in store """
+        heights = list(set(int(height) for height in heights))
+        out = {}
+        with cls.lock:
+            conn = cls._conn()
+            for i in range(0, len(heights), MAX_VARIABLES_PER_QUERY):
+                chunk = heights[i:i + MAX_VARIABLES_PER_QUERY]
+                query = "SELECT height, time FROM block_times WHERE node = ? AND height IN ({})".format(
+                    ",".join("?" * len(chunk)))
+                out.update(conn.execute(query, [node] + chunk).fetchall())
+        return out
+
+    @classmethod
+    def add_many(cls, node, block_times):
+        """ Appends dict of height -> block time to store (existing heights are left unchanged) """
+        with cls.lock:
+            conn = cls._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO block_times VALUES (?, ?, ?)",
+                    ((node, int(height), block_time) for height, block_time in block_times.items())
+                )
+
+    @classmethod
+    def prefill(cls, node, heights):
+        """ Fetches block times of all heights missing from store, in bulk.  Returns dict of height -> block time """
+        heights = set(int(height) for height in heights)
+        out = cls.get_many(node, heights)
+
+        missing = sorted(heights - set(out.keys()))
+        if not missing:
+            return out
+        logging.info("Fetching block times for %s heights...", len(missing))
+
+        fetched = {}
+        i = 0
+        while i < len(missing):
+            min_height = missing[i]
+            max_height = min_height + BLOCKCHAIN_MAX_HEADERS - 1
+            fetched.update(cls._blockchain(node, min_height, max_height))
+
+            while i < len(missing) and missing[i] <= max_height:
+                i += 1
+
+        # Fall back to /block for any height not returned (i.e. node does not support /blockchain)
+        for height in missing:
+            if height not in fetched:
+                fetched[height] = cls._block(node, height)
+
+        cls.add_many(node, fetched)
+        out.update(fetched)
+        return out
+
+    @classmethod
+    def _query(cls, node, uri_path, query_params, sleep_seconds=0.0):
+        url = f"{node}{uri_path}"
+        logging.info("Requesting url %s?%s ...", url, urlencode(query_params))
+        response = cls.session.get(url, params=query_params)
+
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+        return response.json()
+
+    @classmethod
+    def _blockchain(cls, node, min_height, max_height):
+        """ Returns dict of height -> block time for heights in [min_height, max_height] """
+        data = cls._blockchain_data(node, min_height, max_height)
+
+        if "result" not in data:
+            logging.warning("Unable to fetch /blockchain for minHeight=%s, data=%s", min_height, data)
+            return {}
+
+        out = {}
+        for block_meta in data["result"]["block_metas"]:
+            header = block_meta["header"]
+            out[int(header["height"])] = header["time"]
+        return out
+
+    @classmethod
+    @use_debug_files(None, REPORTS_DIR)
+    def _blockchain_data(cls, node, min_height, max_height):
+        query_params = {"minHeight": min_height, "maxHeight": max_height}
+        return cls._query(node, "/blockchain", query_params, sleep_seconds=0.2)
+
+    @classmethod
+    def _block(cls, node, height):
+        data = cls._block_data(node, height)
+        return data["result"]["block"]["header"]["time"]
+
+    @classmethod
+    @use_debug_files(None, REPORTS_DIR)
+    def _block_data(cls, node, height):
+        return cls._query(node, "/block", {"height": height}, sleep_seconds=0.2)
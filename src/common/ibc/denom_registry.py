@@ -0,0 +1,71 @@
+"""
+Local persistent registry of IBC denom traces, keyed by (chain id, denom hash), shared across runs and reports.
+
+Denom traces never change for a given hash (the hash is sha256 of "<path>/<base_denom>"), so rows are only ever
+appended.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+DATADIR = os.path.dirname(os.path.realpath(__file__)) + "/data_denoms"
+
+
+class DenomRegistry:
+
+    path = DATADIR + "/denoms.db"
+    conn = None
+    lock = threading.Lock()
+
+    @classmethod
+    def _conn(cls):
+        if cls.conn is None:
+            # WAL mode allows concurrent readers while another process appends
+            cls.conn = sqlite3.connect(cls.path, check_same_thread=False, timeout=30)
+            cls.conn.execute("PRAGMA journal_mode=WAL")
+            cls.conn.execute(
+                "CREATE TABLE IF NOT EXISTS denom_traces (chain TEXT, hash TEXT, path TEXT, base_denom TEXT, "
+                "PRIMARY KEY (chain, hash)) WITHOUT ROWID")
+            cls.conn.execute("CREATE TABLE IF NOT EXISTS chains (node TEXT PRIMARY KEY, chain TEXT)")
+        return cls.conn
+
+    @classmethod
+    def denom_hash(cls, path, base_denom):
+        """ Returns hash of denom trace (i.e. "transfer/channel-0", "uosmo" -> "ED07A3391A11...") """
+        return hashlib.sha256(f"{path}/{base_denom}".encode()).hexdigest().upper()
+
+    @classmethod
+    def get(cls, chain, hash):
+        """ Returns (path, base_denom) of denom hash if stored, else None """
+        with cls.lock:
+            row = cls._conn().execute(
+                "SELECT path, base_denom FROM denom_traces WHERE chain = ? AND hash = ?", (chain, hash.upper())
+            ).fetchone()
+        return row
+
+    @classmethod
+    def add_many(cls, chain, traces):
+        """ Appends list of (path, base_denom) denom traces of chain to registry """
+        with cls.lock:
+            conn = cls._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO denom_traces VALUES (?, ?, ?, ?)",
+                    ((chain, cls.denom_hash(path, base_denom), path, base_denom) for path, base_denom in traces)
+                )
+
+    @classmethod
+    def get_chain(cls, node):
+        """ Returns chain id of node if stored, else None """
+        with cls.lock:
+            row = cls._conn().execute("SELECT chain FROM chains WHERE node = ?", (node,)).fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def set_chain(cls, node, chain):
+        with cls.lock:
+            conn = cls._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO chains VALUES (?, ?)", (node, chain))
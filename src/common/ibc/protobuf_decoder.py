@@ -1,46 +1,9 @@
-import io
-import sys
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple
+from typing import Optional, Tuple
 
-
-class Varint:
-    """
-    Constructs the integer encoded as a base 128 varint from a stream of bytes.
-    """
-    _varint: int
-    _shift: int
-
-    def __init__(self):
-        self._varint = 0
-        self._shift = 0
-
-    @property
-    def byte_size(self) -> int:
-        return int((self._shift + (8 - (self._shift % 8))) / 8)
-
-    @property
-    def value(self) -> int:
-        return self._varint
-
-    def from_bytes(self, byte_stream: io.BytesIO) -> None:
-        while True:
-            byte = byte_stream.read(1)
-            if byte == b"":
-                raise EOFError("unexpected end of byte sequence while parsing varint")
-
-            # single byte, so byte order doesn't matter
-            byte = int.from_bytes(byte, sys.byteorder)
-
-            # add this byte's data into the varint
-            self._varint |= (byte & 0x7f) << self._shift
-            self._shift += 7
-
-            # if the most significant bit is set, there is another byte to read for this varint
-            if not byte & 0x80:
-                break
+# Field path: field numbers of the enclosing messages followed by the field's own number, i.e. (2, 2, 1)
+FieldPath = Tuple[int, ...]
 
 
 class ProtobufWireType(Enum):
@@ -54,54 +17,29 @@ class ProtobufWireType(Enum):
     END_GROUP = 4
 
 
-@dataclass
-class ProtobufParserFrame:
-    field_number: int
-    end_of_field_offset: Optional[int]
-
-
-class ProtobufParserStack:
-
-    _stack: List[ProtobufParserFrame]
-    _field_path: str
-
-    def __init__(self):
-        self._stack = []
-        self._field_path = ""
-
-    @property
-    def field_path(self) -> str:
-        if not self._field_path:
-            self._make_field_path()
-
-        return self._field_path
-
-    def push_frame(self, field_number: int, end_of_field_offset: Optional[int]) -> None:
-        frame = ProtobufParserFrame(field_number=field_number, end_of_field_offset=end_of_field_offset)
-        self._stack.append(frame)
-        self._clear_field_path()
+_WIRE_TYPES = {wire_type.value: wire_type for wire_type in ProtobufWireType}
 
-    def update_frame(self, end_of_field_offset: int) -> None:
-        if not self._stack:
-            raise RuntimeError("no stack frame to update")
 
-        self._stack[-1].end_of_field_offset = end_of_field_offset
-
-    def peek_frame(self) -> Optional[ProtobufParserFrame]:
-        if not self._stack:
-            return None
-
-        return self._stack[-1]
-
-    def pop_frame(self) -> ProtobufParserFrame:
-        self._clear_field_path()
-        return self._stack.pop()
+def read_varint(buffer: memoryview, offset: int) -> Tuple[int, int]:
+    """
+    Decodes the base 128 varint starting at offset.  Returns (value, offset after varint).
+    """
+    value = 0
+    shift = 0
+    size = len(buffer)
+    while True:
+        if offset >= size:
+            raise EOFError("unexpected end of byte sequence while parsing varint")
+        byte = buffer[offset]
+        offset += 1
 
-    def _make_field_path(self) -> None:
-        self._field_path = ":".join([str(frame.field_number) for frame in self._stack])
+        # add this byte's data into the varint
+        value |= (byte & 0x7f) << shift
+        shift += 7
 
-    def _clear_field_path(self) -> None:
-        self._field_path = ""
+        # if the most significant bit is set, there is another byte to read for this varint
+        if not byte & 0x80:
+            return value, offset
 
 
 class ProtobufParserMessageAction(Enum):
@@ -113,7 +51,7 @@ class ProtobufParserMessageAction(Enum):
 class ProtobufParserCallback(ABC):
 
     @abstractmethod
-    def on_length_delimited_field(self, field_number: int, field_path: str) -> ProtobufParserMessageAction:
+    def on_length_delimited_field(self, field_number: int, field_path: FieldPath) -> ProtobufParserMessageAction:
         """
         Callback function to tell the protobuf parser how to act when it finds a
         length delimited field.
@@ -121,11 +59,11 @@ class ProtobufParserCallback(ABC):
         raise NotImplementedError()
 
     @abstractmethod
-    def on_field(self, wire_type: ProtobufWireType, field_number: int, field_value: bytes, field_path: str) -> None:
+    def on_field(self, wire_type: ProtobufWireType, field_number: int, field_value: bytes, field_path: FieldPath) -> None:
         """
         Callback function when a new field that isn't a message is found.
         The value is passed as bytes and up to the user to determine how to decode it.
-        The field_path is a colon delimited string of the field numbers this field is a child of.
+        The field_path is a tuple of the field numbers this field is a child of, ending with field_number.
         """
         raise NotImplementedError()
 
@@ -136,9 +74,9 @@ class CosmosTransactionFeeExtractor(ProtobufParserCallback):
     structure defined here: https://github.com/cosmos/cosmos-sdk/blob/main/proto/cosmos/tx/v1beta1/tx.proto.
     """
 
-    coin_message_base_path: str = "2:2:1"
-    coin_denom_path: str = f"{coin_message_base_path}:1"
-    coin_amount_path: str = f"{coin_message_base_path}:2"
+    coin_message_base_path: FieldPath = (2, 2, 1)
+    coin_denom_path: FieldPath = coin_message_base_path + (1,)
+    coin_amount_path: FieldPath = coin_message_base_path + (2,)
 
     _fee_denom: Optional[str]
     _fee_amount: Optional[str]
@@ -155,19 +93,19 @@ class CosmosTransactionFeeExtractor(ProtobufParserCallback):
     def fee_amount(self) -> Optional[str]:
         return self._fee_amount
 
-    def on_length_delimited_field(self, field_number: int, field_path: str) -> ProtobufParserMessageAction:
+    def on_length_delimited_field(self, field_number: int, field_path: FieldPath) -> ProtobufParserMessageAction:
         if not field_path:
             raise RuntimeError(f"unexpected empty field path while processing protobuf data")
 
         if field_path in (self.coin_denom_path, self.coin_amount_path):
             return ProtobufParserMessageAction.PARSE_AS_BYTES
 
-        if self.coin_message_base_path.startswith(field_path):
+        if self.coin_message_base_path[:len(field_path)] == field_path:
             return ProtobufParserMessageAction.PARSE_AS_MESSAGE
 
         return ProtobufParserMessageAction.SKIP
 
-    def on_field(self, wire_type: ProtobufWireType, field_number: int, field_value: bytes, field_path: str) -> None:
+    def on_field(self, wire_type: ProtobufWireType, field_number: int, field_value: bytes, field_path: FieldPath) -> None:
         if field_path == self.coin_denom_path:
             self._fee_denom = field_value.decode("utf-8")
         elif field_path == self.coin_amount_path:
@@ -181,105 +119,82 @@ class ProtobufParser:
     into an application.
 
     Implements the encoding described here: https://developers.google.com/protocol-buffers/docs/encoding.
+    Reads the data in place (memoryview with integer offsets); only values passed to the callback are copied.
     """
 
-    _buffer: io.BytesIO
-    _buffer_size: int
+    _buffer: memoryview
     _callback: ProtobufParserCallback
 
     def __init__(self, protobuf_bytes: bytes, callback: ProtobufParserCallback):
-        self._buffer = io.BytesIO(protobuf_bytes)
-        self._buffer_size = len(protobuf_bytes)
+        self._buffer = memoryview(protobuf_bytes)
         self._callback = callback
 
     def parse(self) -> None:
-        parser_stack: ProtobufParserStack = ProtobufParserStack()
-        while self._buffer.tell() < self._buffer_size:
-            # get the next field key
-            wire_type, field_number = self._get_field_key()
+        buffer = self._buffer
+        size = len(buffer)
+        callback = self._callback
+
+        offset = 0
+        message_path = ()  # field numbers of the enclosing messages
+        message_ends = []  # end offsets of the enclosing messages
+        while offset < size:
+            # get the next field key (inline fast path for single byte varint)
+            field_key = buffer[offset]
+            if field_key < 0x80:
+                offset += 1
+            else:
+                field_key, offset = read_varint(buffer, offset)
+            wire_type = field_key & 0x07
+            field_number = field_key >> 3
+            field_path = message_path + (field_number,)
 
             # get the field value
-            parser_stack.push_frame(field_number=field_number, end_of_field_offset=None)
-            field_value, parse_embedded_message, embedded_message_length = self._get_field_value(wire_type, field_number, parser_stack)
-            if parse_embedded_message:
-                parser_stack.update_frame(end_of_field_offset=self._buffer.tell() + embedded_message_length)
-                continue
+            field_value = None
+            if wire_type == 0:
+                value, value_end = read_varint(buffer, offset)
+                field_value = value.to_bytes((value_end - offset) * 7 // 8 + 1, "little")
+                offset = value_end
+            elif wire_type == 2:
+                if offset < size and buffer[offset] < 0x80:
+                    field_value_length = buffer[offset]
+                    offset += 1
+                else:
+                    field_value_length, offset = read_varint(buffer, offset)
+                end = offset + field_value_length
+
+                # see what the user wants us to do
+                action = callback.on_length_delimited_field(field_number, field_path)
+                if action == ProtobufParserMessageAction.PARSE_AS_MESSAGE:
+                    message_path = field_path
+                    message_ends.append(end)
+                else:
+                    if action == ProtobufParserMessageAction.PARSE_AS_BYTES:
+                        field_value = self._read_bytes(offset, end)
+                    elif end > size:
+                        raise EOFError("unexpected end of byte sequence while reading protobuf")
+                    offset = end
+            elif wire_type == 1:
+                field_value = self._read_bytes(offset, offset + 8)
+                offset += 8
+            elif wire_type == 5:
+                field_value = self._read_bytes(offset, offset + 4)
+                offset += 4
+            elif wire_type == 3 or wire_type == 4:
+                raise NotImplementedError("The start and end group wire types are deprecated and not supported")
+            else:
+                raise RuntimeError(f"Unknown wire type found [{wire_type}")
 
             # callback the application with any values found
             if field_value is not None:
-                self._callback.on_field(wire_type, field_number, field_value, parser_stack.field_path)
-
-            # cleanup
-            parser_stack.pop_frame()
-            while frame := parser_stack.peek_frame():
-                if frame.end_of_field_offset != self._buffer.tell():
-                    break
-
-                parser_stack.pop_frame()
-
-    def _get_field_key(self) -> Tuple[ProtobufWireType, int]:
-        field_key = self._read_varint().value
-
-        wire_type = field_key & 0x07
-        field_number = field_key >> 3
-
-        return ProtobufWireType(wire_type), field_number
-
-    def _get_field_value(self, wire_type: ProtobufWireType, field_number: int, parser_stack: ProtobufParserStack) -> Tuple[Optional[bytes], bool, int]:
-        if wire_type == ProtobufWireType.START_GROUP or wire_type == ProtobufWireType.END_GROUP:
-            raise NotImplementedError("The start and end group wire types are deprecated and not supported")
-
-        parse_embedded_message = False
-        embedded_message_length = None
-
-        if wire_type == ProtobufWireType.VARINT:
-            field_value = self._parse_varint_value()
-        elif wire_type == ProtobufWireType.FIXED_64_BIT:
-            field_value = self._parse_fixed_64_bit_value()
-        elif wire_type == ProtobufWireType.LENGTH_DELIMITED:
-            field_value, parse_embedded_message, embedded_message_length = self._parse_length_delimited_value(field_number, parser_stack)
-        elif wire_type == ProtobufWireType.FIXED_32_BIT:
-            field_value = self._parse_fixed_32_bit_value()
-        else:
-            raise RuntimeError(f"Unknown wire type found [{wire_type}")
-
-        return field_value, parse_embedded_message, embedded_message_length
-
-    def _parse_varint_value(self) -> bytes:
-        varint = self._read_varint()
-        return varint.value.to_bytes(varint.byte_size, "little")
-
-    def _parse_length_delimited_value(self, field_number: int, parser_stack: ProtobufParserStack) -> Tuple[Optional[bytes], bool, int]:
-        # get the length
-        field_value_length = self._read_varint().value
-
-        # see what the user wants us to do
-        action = self._callback.on_length_delimited_field(field_number, parser_stack.field_path)
-
-        # see if we should read the field_value
-        field_value = None
-        if action in [ProtobufParserMessageAction.SKIP, ProtobufParserMessageAction.PARSE_AS_BYTES]:
-            temp_value = self._read_bytes(field_value_length)
-            if action == ProtobufParserMessageAction.PARSE_AS_BYTES:
-                field_value = temp_value
-
-        return field_value, action == ProtobufParserMessageAction.PARSE_AS_MESSAGE, field_value_length
-
-    def _parse_fixed_64_bit_value(self) -> bytes:
-        return self._read_bytes(8)
-
-    def _parse_fixed_32_bit_value(self) -> bytes:
-        return self._read_bytes(4)
-
-    def _read_varint(self) -> Varint:
-        varint = Varint()
-        varint.from_bytes(self._buffer)
+                callback.on_field(_WIRE_TYPES[wire_type], field_number, field_value, field_path)
 
-        return varint
+            # cleanup: leave every message that ends here
+            while message_ends and message_ends[-1] == offset:
+                message_ends.pop()
+                message_path = message_path[:-1]
 
-    def _read_bytes(self, size: int) -> bytes:
-        bytes_read = self._buffer.read(size)
-        if bytes_read == b"":
+    def _read_bytes(self, start: int, end: int) -> bytes:
+        if end > len(self._buffer):
             raise EOFError("unexpected end of byte sequence while reading protobuf")
 
-        return bytes_read
+        return self._buffer[start:end].tobytes()
@@ -1,5 +1,9 @@
 import logging
+import queue
 import time
+from concurrent.futures import wait
+
+PROGRESS_INTERVAL_SECONDS = 1
 
 
 class Stage:
@@ -53,3 +57,38 @@ class Progress:
                 "stage_total_tasks": stage.total_tasks,
                 "stage_current_task_number": stage.current_task_number,
             })
+
+
+class QueuedProgress:
+    """ Progress passed to worker threads.  Reports are queued, and only written to progress (and job) from the main
+    thread, in result(). """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def report(self, num, message, stage_name="default"):
+        self.queue.put((num, message, stage_name))
+
+    def report_message(self, message):
+        self.queue.put((None, message, None))
+
+    def flush(self, progress):
+        while True:
+            try:
+                num, message, stage_name = self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+            if stage_name is None:
+                progress.report_message(message)
+            else:
+                progress.report(num, message, stage_name)
+
+    def result(self, future, progress):
+        """ Waits for future, reporting queued progress meanwhile.  Returns future's result. """
+        while not future.done():
+            wait([future], timeout=PROGRESS_INTERVAL_SECONDS)
+            self.flush(progress)
+        self.flush(progress)
+        return future.result()
+
@@ -54,7 +54,14 @@ def parse_args(ticker):
             type=str,
             help="(YYYY-MM-DD) Only include transactions after start_date (inclusive)",
         )
-    if ticker in (TICKER_ALGO):
+    if ticker == TICKER_SOL:
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            default=False,
+            help="only fetch transactions since previous run of this wallet (reuses previous run's results)",
+        )
+    if ticker in (TICKER_ALGO, TICKER_SOL):
         parser.add_argument(
             "--end_date",
             type=str,
@@ -112,6 +119,8 @@ def parse_args(ticker):
         options["lp_treatment"] = args.lp_treatment
     if "legacy" in args and args.legacy:
         options["legacy"] = True
+    if "incremental" in args and args.incremental:
+        options["incremental"] = True
     if "exclude_asas" in args and args.exclude_asas:
         options["exclude_asas"] = args.exclude_asas
 
@@ -13,6 +13,7 @@ from common.ibc.api_common import (
     EVENTS_TYPE_SENDER,
     EVENTS_TYPE_SIGNER,
 )
+from common.ibc.block_times import BlockTimeCache
 from dateutil import parser
 from fet.config_fet import localconfig
 from settings_csv import REPORTS_DIR
@@ -79,20 +80,13 @@ class FetRpcAPI:
         elem = data.get("result", None)
         return elem
 
-    @use_debug_files(localconfig, REPORTS_DIR)
-    def _block(self, height):
-        uri_path = "/block"
-        query_params = {"height": height}
-
-        data = self._query(uri_path, query_params, sleep_seconds=0.2)
-
-        return data
+    def prefill_block_times(self, heights):
+        """ Fetches block times of all heights in bulk, so that block_time() calls are served from cache """
+        BlockTimeCache.prefill(self.node, heights)
 
     def block_time(self, height):
-        data = self._block(height)
-
         # i.e. "2021-08-26T21:08:44.86954814Z" -> "2021-08-26 21:08:44"
-        ts = data["result"]["block"]["header"]["time"]
+        ts = BlockTimeCache.get(self.node, height)
         timestamp = parser.parse(ts).strftime("%Y-%m-%d %H:%M:%S")
         return timestamp
 
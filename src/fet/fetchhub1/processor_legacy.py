@@ -8,6 +8,7 @@ from fet.fetchhub1.TxInfoFet import TxInfoFet, MsgInfo
 from fet.fetchhub1.handle_tx import handle_tx
 import fet.handle_contract
 import common.ibc.handle
+from common.ibc.api_rpc import parse_log
 from fet.config_fet import localconfig
 from fet.fetchhub1.get_fee import get_fee
 
@@ -35,7 +36,7 @@ def process_tx_legacy(wallet_address, elem, exporter, node):
 
 def _decode(elem):
     """ Modifies transaction data with decoded version """
-    elem["tx_result"]["log"] = eval(elem["tx_result"]["log"])
+    elem["tx_result"]["log"] = parse_log(elem["tx_result"]["log"])
 
     events = elem["tx_result"]["events"]
     for event in events:
@@ -7,16 +7,21 @@ import common.ibc.handle
 import common.ibc.constants
 from fet.config_fet import localconfig
 from settings_csv import FET_NODE
+from fet.fetchhub1.api_rpc import FetRpcAPI
 from fet.fetchhub1.processor_legacy import process_tx_legacy
 from fet.handle_tx import handle_tx
 from fet.handle_contract import handle_contract
 
 
 def process_txs(wallet_address, elems, exporter, node, progress=None):
+    if node == co2.FET_FETCHUB1_NODE:
+        # Resolve timestamps of all transactions in bulk (rpc data has block height only)
+        FetRpcAPI(node).prefill_block_times([elem["height"] for elem in elems])
+
     for i, elem in enumerate(elems):
         process_tx(wallet_address, elem, exporter, node)
 
-        # Update progress bar for slower processing of fetchhub-1 (due to required timestamp query for each tx)
+        # Update progress bar for slower processing of fetchhub-1 (fee decoding through fetchcli for each tx)
         if node == co2.FET_FETCHUB1_NODE:
             if i % 10 == 0 or i == len(elems) - 1:
                 message = f"Processed {i + 1} of {len(elems)} transactions for fetchhub1"
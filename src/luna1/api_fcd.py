@@ -1,13 +1,22 @@
 import logging
+import random
 import time
 import requests
 from settings_csv import REPORTS_DIR
 from common.debug_util import use_debug_files
+from common.RateLimiter import RateLimiter
 from luna1.config_luna1 import localconfig
 
 FCD_URL = "https://columbus-fcd.terra.dev"
 LIMIT_FCD = 100
 
+# Requests/second: starts at RATE_FCD, adapts between RATE_FCD_MIN (old fixed 5 second sleep) and RATE_FCD_MAX
+RATE_FCD = 0.5
+RATE_FCD_MIN = 0.2
+RATE_FCD_MAX = 2
+MAX_RETRIES = 5
+BACKOFF_MAX_SECONDS = 60
+
 
 class FcdAPI:
     session = requests.Session()
@@ -34,11 +43,53 @@ class FcdAPI:
 
     @classmethod
     def _query(cls, url):
-        logging.info("Querying FCD url=%s...", url)
-        response = cls.session.get(url)
-        data = response.json()
-        time.sleep(5)
-        return data
+        limiter = cls._rate_limiter()
+
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt > 0:
+                limiter.on_retry()
+            limiter.acquire()
+
+            logging.info("Querying FCD url=%s...", url)
+            time_start = time.time()
+            try:
+                response = cls.session.get(url)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == MAX_RETRIES:
+                    raise e
+                s = cls._backoff_seconds(attempt)
+                logging.warning("Returned timeout.  Sleeping %s seconds and retrying...", s)
+                time.sleep(s)
+                continue
+
+            # Rate limited or overloaded node
+            if response.status_code == 429 or response.status_code >= 500:
+                limiter.on_rate_limited()
+                if attempt == MAX_RETRIES:
+                    break
+                s = cls._backoff_seconds(attempt)
+                logging.warning("Returned status_code=%s.  Sleeping %s seconds and retrying...",
+                                response.status_code, s)
+                time.sleep(s)
+                continue
+
+            limiter.on_success(time.time() - time_start)
+            break
+
+        return response.json()
+
+    @classmethod
+    def _rate_limiter(cls):
+        return RateLimiter.for_key(FCD_URL, RATE_FCD, min_rate=RATE_FCD_MIN, max_rate=RATE_FCD_MAX, increase=0.05)
+
+    @classmethod
+    def stats(cls):
+        """ Returns throttle/retry statistics for FCD_URL """
+        return cls._rate_limiter().stats()
+
+    @classmethod
+    def _backoff_seconds(cls, attempt):
+        return min(BACKOFF_MAX_SECONDS, 5 * 2 ** attempt) + random.random()
 
     @classmethod
     def _add_events_by_type(cls, elem):
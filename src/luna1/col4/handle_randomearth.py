@@ -1,7 +1,7 @@
 from common.ErrorCounter import ErrorCounter
 from common.ExporterTypes import TX_TYPE_NFT_WHITELIST, TX_TYPE_NFT_CANCEL_ORDER
 from luna1 import util_terra
-from luna1.api_lcd import LcdAPI
+from luna1.contract_registry import ContractRegistry
 from luna1.col4.handle_simple import handle_simple, handle_unknown
 from luna1.make_tx import (
     make_nft_buy_tx,
@@ -180,14 +180,8 @@ def _coin_spent(coin_spent, wallet_address):
     return None, None
 
 
-cache_names = {}
-
-
 def _nft_name(contract):
-    if contract in cache_names:
-        return cache_names[contract]
-
-    data = LcdAPI.contract_info(contract)
+    data = ContractRegistry.contract_info(contract)
 
     try:
         init_msg = data["result"]["init_msg"]
@@ -197,7 +191,6 @@ def _nft_name(contract):
     except Exception:
         name = ""
 
-    cache_names[contract] = name
     return name
 
 
@@ -0,0 +1,143 @@
+"""
+Local persistent registry of Terra Classic contract info (/wasm/contracts/<address>), shared across runs.
+
+Contract info includes the init msg, from which currency symbol/decimals, LP pair and NFT collection name are
+derived (see util_terra).  It does not change once a contract is instantiated, so rows are only ever appended.
+Lookups that fail because the address is not a contract (i.e. a wallet address) are also stored, and retried after
+NOT_FOUND_TTL_SECONDS.  Other errors (rate limit, node errors) are never stored.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from luna1.api_lcd import LcdAPI
+
+DATADIR = os.path.dirname(os.path.realpath(__file__)) + "/data_contracts"
+MAX_WORKERS = 4
+MAX_VARIABLES_PER_QUERY = 500
+NOT_FOUND_TTL_SECONDS = 86400
+# lcd error messages for an address that is not a (valid) contract (besides "<address>: not found")
+NOT_FOUND_ERRORS = ("contract not found", "decoding bech32 failed")
+
+
+class ContractRegistry:
+
+    path = DATADIR + "/contracts.db"
+    conn = None
+    lock = threading.Lock()
+    infos = {}  # <address> -> contract info or error (in memory copy of rows read/written by this process)
+
+    @classmethod
+    def _conn(cls):
+        if cls.conn is None:
+            # WAL mode allows concurrent readers while another process appends
+            cls.conn = sqlite3.connect(cls.path, check_same_thread=False, timeout=30)
+            cls.conn.execute("PRAGMA journal_mode=WAL")
+            cls.conn.execute("CREATE TABLE IF NOT EXISTS contracts (address TEXT PRIMARY KEY, info TEXT)")
+            cls.conn.execute(
+                "CREATE TABLE IF NOT EXISTS not_found (address TEXT PRIMARY KEY, error TEXT, time INTEGER)")
+        return cls.conn
+
+    @classmethod
+    def get_many(cls, addresses):
+        """ Returns dict of address -> contract info (or lcd error, for recent failed lookups) for addresses found in
+        registry """
+        out = {}
+        missing = []
+        with cls.lock:
+            for address in set(addresses):
+                if address in cls.infos:
+                    out[address] = cls.infos[address]
+                else:
+                    missing.append(address)
+
+            conn = cls._conn()
+            for i in range(0, len(missing), MAX_VARIABLES_PER_QUERY):
+                chunk = missing[i:i + MAX_VARIABLES_PER_QUERY]
+                query = "SELECT address, info FROM contracts WHERE address IN ({})".format(",".join("?" * len(chunk)))
+                for address, info in conn.execute(query, chunk).fetchall():
+                    cls.infos[address] = json.loads(info)
+                    out[address] = cls.infos[address]
+
+            missing = [address for address in missing if address not in out]
+            min_time = int(time.time()) - NOT_FOUND_TTL_SECONDS
+            for i in range(0, len(missing), MAX_VARIABLES_PER_QUERY):
+                chunk = missing[i:i + MAX_VARIABLES_PER_QUERY]
+                query = "SELECT address, error FROM not_found WHERE time >= ? AND address IN ({})".format(
+                    ",".join("?" * len(chunk)))
+                for address, error in conn.execute(query, [min_time] + chunk).fetchall():
+                    cls.infos[address] = json.loads(error)
+                    out[address] = cls.infos[address]
+        return out
+
+    @classmethod
+    def add(cls, address, data):
+        with cls.lock:
+            cls.infos[address] = data
+            conn = cls._conn()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO contracts VALUES (?, ?)", (address, json.dumps(data)))
+
+    @classmethod
+    def add_not_found(cls, address, data):
+        with cls.lock:
+            cls.infos[address] = data
+            conn = cls._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO not_found VALUES (?, ?, ?)",
+                             (address, json.dumps(data), int(time.time())))
+
+    @classmethod
+    def contract_info(cls, address):
+        """ Returns contract info (LcdAPI.contract_info() result) from registry, querying lcd if not stored """
+        data = cls.get_many([address]).get(address)
+        if data is not None:
+            return data
+
+        data = LcdAPI.contract_info(address)
+
+        if "result" in data:
+            cls.add(address, data)
+        elif cls._is_not_found(address, data):
+            cls.add_not_found(address, data)
+        return data
+
+    @classmethod
+    def _is_not_found(cls, address, data):
+        """ Returns True if lcd response is a definitive 'not a contract' error (not i.e. rate limit error) """
+        error = data.get("error") if isinstance(data, dict) else None
+        if not isinstance(error, str):
+            return False
+
+        error = error.lower()
+        return f"{address.lower()}: not found" in error or any(message in error for message in NOT_FOUND_ERRORS)
+
+    @classmethod
+    def prefetch(cls, addresses):
+        """ Queries contract info of all addresses missing from registry, concurrently.  Returns dict of
+        address -> contract info (excludes addresses whose query failed) """
+        addresses = set(addresses)
+        out = cls.get_many(addresses)
+
+        missing = sorted(addresses - set(out.keys()))
+        if missing:
+            logging.info("Fetching contract info for %s contracts...", len(missing))
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                for address, data in zip(missing, executor.map(cls._prefetch_one, missing)):
+                    if data is not None:
+                        out[address] = data
+        return out
+
+    @classmethod
+    def _prefetch_one(cls, address):
+        # Prefetch is only an optimization: on failure, contract is looked up again when processing
+        try:
+            return cls.contract_info(address)
+        except Exception as e:
+            logging.warning("Unable to prefetch contract info for address=%s, exception=%s", address, str(e))
+            return None
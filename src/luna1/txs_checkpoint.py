@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+import time
+
+from settings_csv import REPORTS_DIR, TICKER_LUNA1
+
+MAX_AGE_SECONDS = 86400  # older checkpoints are discarded (would miss transactions made since)
+
+
+class TxsCheckpoint:
+    """ FCD transaction pages fetched so far for a wallet, persisted so that an interrupted run can resume.
+
+    File has one json line per fetched page: {"time": <unix timestamp>, "next": <next offset>, "txs": [...]}.
+    Lines are only appended, so a crash leaves at most one partial (ignored) last line.
+    """
+
+    def __init__(self, wallet_address):
+        self.wallet_address = wallet_address
+        self.path = f"{REPORTS_DIR}/checkpoint.{TICKER_LUNA1}.{wallet_address}.jsonl"
+
+    def load(self):
+        """ Returns (list of txs, next offset, number of pages) fetched by previous interrupted run """
+        txs, next_offset, num_pages = [], 0, 0
+        if not os.path.exists(self.path):
+            return txs, next_offset, num_pages
+
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    page = json.loads(line)
+                except ValueError:
+                    break
+
+                if num_pages == 0 and time.time() - page["time"] > MAX_AGE_SECONDS:
+                    logging.info("Ignoring %s (older than %s seconds)", self.path, MAX_AGE_SECONDS)
+                    return [], 0, 0
+
+                txs.extend(page["txs"])
+                next_offset = page["next"]
+                num_pages += 1
+
+        logging.info("Resuming from %s (%s pages, %s txs)", self.path, num_pages, len(txs))
+        return txs, next_offset, num_pages
+
+    def add_page(self, txs, next_offset):
+        if not os.path.exists(REPORTS_DIR):
+            os.mkdir(REPORTS_DIR)
+
+        line = json.dumps({"time": int(time.time()), "next": next_offset, "txs": txs})
+        with open(self.path, "a") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -5,11 +5,13 @@ import json
 import logging
 
 from settings_csv import TERRA_LCD_NODE
-from luna1.api_lcd import LcdAPI
 from luna1.config_luna1 import localconfig
+from luna1.contract_registry import ContractRegistry
 import common.ibc.api_lcd
 from luna1.constants import CUR_UST
 
+MAX_PREFETCH_DEPTH = 3  # i.e. lp token -> lp pair -> pair tokens
+
 def _contracts(elem):
     out = []
 
@@ -403,7 +405,7 @@ def _query_lp_address(addr, txid):
 
 
 def _query_wasm(addr):
-    data = LcdAPI.contract_info(addr)
+    data = ContractRegistry.contract_info(addr)
 
     init_msg = _init_msg(data)
     return init_msg
@@ -418,6 +420,71 @@ def _init_msg(data):
     return init_msg
 
 
+def prefetch_contracts(elems):
+    """ Fetches contract info of all contracts referenced by transactions (and by those contracts' init msgs, i.e.
+    LP pair tokens) into ContractRegistry, concurrently, so that processing does not query them one at a time. """
+    addresses = set()
+    for elem in elems:
+        try:
+            addresses.update(_referenced_contracts_tx(elem))
+        except Exception as e:
+            # Unexpected tx format: contracts are looked up when processing instead
+            logging.warning("Unable to find contracts of txid=%s, exception=%s", elem.get("txhash"), str(e))
+
+    seen = set()
+    for _ in range(MAX_PREFETCH_DEPTH):
+        addresses -= seen
+        if not addresses:
+            break
+        seen.update(addresses)
+
+        infos = ContractRegistry.prefetch(addresses)
+        addresses = set()
+        for data in infos.values():
+            try:
+                init_msg = _init_msg(data)
+                addresses.update(_referenced_contracts_init_msg(init_msg))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+
+def _referenced_contracts_tx(elem):
+    out = set()
+
+    for msg in elem["tx"]["value"]["msg"]:
+        contract = msg["value"].get("contract", None)
+        if contract:
+            out.add(contract)
+
+    for log in elem.get("logs", None) or []:
+        events_by_type = log.get("events_by_type", {})
+        for event_type in ("execute_contract", "from_contract", "wasm"):
+            if event_type in events_by_type:
+                out.update(events_by_type[event_type].get("contract_address", []))
+
+    return out
+
+
+def _referenced_contracts_init_msg(init_msg):
+    """ Returns contract addresses referenced by init msg (see _lookup_lp_address(), _query_lp_address()).
+
+    Only fields that always hold contract addresses are followed (not i.e. mint.minter, usually a wallet address).
+    """
+    out = set()
+    if not isinstance(init_msg, dict):
+        return out
+
+    if isinstance(init_msg.get("init_hook"), dict) and "contract_addr" in init_msg["init_hook"]:
+        out.add(init_msg["init_hook"]["contract_addr"])
+    if isinstance(init_msg.get("staking_token"), str):
+        out.add(init_msg["staking_token"])
+    for asset_info in init_msg.get("asset_infos", None) or []:
+        if isinstance(asset_info, dict) and "token" in asset_info:
+            out.add(asset_info["token"]["contract_addr"])
+
+    return set(address for address in out if isinstance(address, str) and address.startswith("terra"))
+
+
 def _event_with_action(elem, event_type, action):
     logs = elem["logs"]
     for log in logs:
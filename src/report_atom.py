@@ -10,11 +10,13 @@ https://node.atomscan.com/swagger/
 
 """
 
+import itertools
 import json
 import logging
 import math
 import os
 import pprint
+from concurrent.futures import ThreadPoolExecutor
 
 import atom.api_cosmostation
 import atom.api_lcd
@@ -24,6 +26,7 @@ from atom.progress_atom import SECONDS_PER_PAGE, ProgressAtom
 from common import report_util
 from common.Cache import Cache
 from common.Exporter import Exporter
+from common.progress import QueuedProgress
 from common.ExporterTypes import FORMAT_DEFAULT
 from settings_csv import TICKER_ATOM
 
@@ -87,13 +90,18 @@ def txhistory(wallet_address, options):
     count_pages = atom.api_lcd.get_txs_count_pages(wallet_address)
     progress.set_estimate(count_pages)
 
-    # Fetch legacy transactions conditionally (cosmoshub-3)
-    elems = []
-    if localconfig.legacy:
-        elems.extend(_fetch_txs_legacy(wallet_address, progress))
+    # Worker threads queue progress reports; main thread applies them
+    fetch_progress = QueuedProgress()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Fetch legacy transactions conditionally (cosmoshub-3), in background
+        future_legacy = executor.submit(
+            _fetch_txs_legacy, wallet_address, fetch_progress) if localconfig.legacy else None
+
+        # Fetch transactions
+        elems_txs = _fetch_txs(wallet_address, progress, fetch_progress)
 
-    # Fetch transactions
-    elems.extend(_fetch_txs(wallet_address, progress))
+        elems = fetch_progress.result(future_legacy, progress) if future_legacy else []
+    elems.extend(elems_txs)
     elems = _remove_duplicates(elems)
 
     progress.report_message(f"Processing {len(elems)} ATOM transactions... ")
@@ -129,28 +137,24 @@ def _fetch_txs_legacy(wallet_address, progress):
     return out
 
 
-def _fetch_txs(wallet_address, progress):
+def _fetch_txs(wallet_address, progress, fetch_progress):
     if localconfig.debug:
         debug_file = f"_reports/testatom.{wallet_address}.json"
         if os.path.exists(debug_file):
             with open(debug_file, "r") as f:
                 return json.load(f)
 
-    out = []
-    current_page = 0
-    # Two passes: is_sender=True (message.sender events) and is_sender=False (transfer.recipient events)
-    for is_sender in (True, False):
-        offset = 0
-        for _ in range(0, _max_pages()):
-            message = "Fetching page {} for {}".format(current_page + 1, "sender" if is_sender else "recipient")
-            progress.report(current_page, message)
-            current_page += 1
-
-            elems, offset, _ = atom.api_lcd.get_txs(wallet_address, is_sender, offset)
-
-            out.extend(elems)
-            if offset is None:
-                break
+    # Two passes, run concurrently: is_sender=True (message.sender events) and is_sender=False (transfer.recipient
+    # events)
+    page_numbers = itertools.count()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(_fetch_txs_pass, wallet_address, is_sender, fetch_progress, page_numbers)
+            for is_sender in (True, False)
+        ]
+        out = []
+        for future in futures:
+            out.extend(fetch_progress.result(future, progress))
 
     # Debugging only
     if localconfig.debug:
@@ -160,6 +164,23 @@ def _fetch_txs(wallet_address, progress):
     return out
 
 
+def _fetch_txs_pass(wallet_address, is_sender, progress, page_numbers):
+    out = []
+    offset = 0
+    for _ in range(0, _max_pages()):
+        current_page = next(page_numbers)
+        message = "Fetching page {} for {}".format(current_page + 1, "sender" if is_sender else "recipient")
+        progress.report(current_page, message)
+
+        elems, offset, _ = atom.api_lcd.get_txs(wallet_address, is_sender, offset)
+
+        out.extend(elems)
+        if offset is None:
+            break
+
+    return out
+
+
 def _remove_duplicates(elems):
     out = []
     txids = set()
@@ -76,8 +76,9 @@ def txhistory(wallet_address, options):
     progress = ProgressDvpn()
     exporter = Exporter(wallet_address, localconfig, TICKER_DVPN)
 
-    # LCD - fetch count of transactions to estimate progress more accurately
-    lcd_count_pages = common.ibc.api_lcd.get_txs_pages_count(DVPN_LCD_NODE, wallet_address, max_txs, debug=localconfig.debug)
+    # LCD - fetch count of transactions to estimate progress more accurately (first pages reused below)
+    lcd_session = common.ibc.api_lcd.LcdTxsSession(DVPN_LCD_NODE, wallet_address, max_txs, debug=localconfig.debug)
+    lcd_count_pages = lcd_session.pages_count()
     progress.set_lcd_estimate(lcd_count_pages)
     # RPC - fetch count of transactions to estimate progress more accurately
     rpc_count_pages = common.ibc.api_rpc.get_txs_pages_count(DVPN_RPC_NODE, wallet_address, max_txs,
@@ -85,10 +86,7 @@ def txhistory(wallet_address, options):
     progress.set_rpc_estimate(rpc_count_pages)
 
     # LCD - fetch transactions
-    lcd_elems = common.ibc.api_lcd.get_txs_all(DVPN_LCD_NODE, wallet_address, progress, max_txs,
-                                               debug=localconfig.debug,
-                                               stage_name="lcd"
-                                               )
+    lcd_elems = lcd_session.get_txs_all(progress, stage_name="lcd")
 
     # Some older transaction types can no longer be processed through the latest sentinelhub LCD api (version 0.9.2 at time of writing).
     # Example failure message:
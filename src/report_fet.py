@@ -6,21 +6,25 @@ Prints transactions and writes CSV(s) to _reports/FET*.csv
 
 import logging
 import pprint
+from concurrent.futures import ThreadPoolExecutor
 
 from fet.config_fet import localconfig
 from fet.progress_fet import SECONDS_PER_PAGE, ProgressFet
 from common import report_util
 from common.Cache import Cache
 from common.Exporter import Exporter
+from common.progress import QueuedProgress
 from common.ExporterTypes import FORMAT_DEFAULT
 from settings_csv import TICKER_FET, FET_NODE
 import common.ibc.api_lcd
+from common.ibc.block_times import BlockTimeCache
 from fet.fetchhub1.api_rpc import FetRpcAPI
 from fet.fetchhub1 import constants as co2
 import fet.processor
 import fet.fetchhub1.processor_legacy
 from common.ibc.api_lcd import EVENTS_TYPE_SENDER, EVENTS_TYPE_RECIPIENT, EVENTS_TYPE_SIGNER
 EVENTS_TYPES_FET = (EVENTS_TYPE_SENDER, EVENTS_TYPE_RECIPIENT)
+NUM_ERAS = 4  # fetchhub-1 .. fetchhub-4
 
 
 def main():
@@ -39,6 +43,7 @@ def main():
 
 def _read_options(options):
     report_util.read_common_options(localconfig, options)
+    BlockTimeCache.debug = localconfig.debug
     logging.info("localconfig: %s", localconfig.__dict__)
 
 
@@ -107,50 +112,60 @@ def txhistory(wallet_address, options):
     progress = ProgressFet()
     exporter = Exporter(wallet_address, localconfig, TICKER_FET)
 
-    # Fetch count of pages/transactions to estimate progress more accurately
-    pages_fet1, txs_fet1 = fet.fetchhub1.api_rpc.get_txs_pages_count(
-        co2.FET_FETCHUB1_NODE, wallet_address, max_txs, debug=localconfig.debug, events_types=EVENTS_TYPES_FET)
-    pages_fet2 = common.ibc.api_lcd.get_txs_pages_count(
+    session_fet2 = common.ibc.api_lcd.LcdTxsSession(
         co2.FET_FETCHUB2_NODE, wallet_address, max_txs, debug=localconfig.debug, events_types=EVENTS_TYPES_FET)
-    pages_fet3 = common.ibc.api_lcd.get_txs_pages_count(
+    session_fet3 = common.ibc.api_lcd.LcdTxsSession(
         co2.FET_FETCHUB3_NODE, wallet_address, max_txs, debug=localconfig.debug, events_types=EVENTS_TYPES_FET)
-    pages_fet4 = common.ibc.api_lcd.get_txs_pages_count(
+    session_fet4 = common.ibc.api_lcd.LcdTxsSession(
         FET_NODE, wallet_address, max_txs, debug=localconfig.debug, events_types=EVENTS_TYPES_FET)
-    progress.set_estimate_fet1(pages_fet1, txs_fet1)
-    progress.set_estimate_fet2(pages_fet2)
-    progress.set_estimate_fet3(pages_fet3)
-    progress.set_estimate_fet4(pages_fet4)
-
-    # fetchhub1
-    elems_1 = fet.fetchhub1.api_rpc.get_txs_all(
-        co2.FET_FETCHUB1_NODE, wallet_address, progress, max_txs, debug=localconfig.debug,
-        stage_name=progress.STAGE_FET1_PAGES, events_types=EVENTS_TYPES_FET)
-    # Update to more accurate estimate after removing duplicates
-    progress.stages[progress.STAGE_FET1_TXS].total_tasks = len(elems_1)
-    progress.report_message(f"Processing {len(elems_1)} transactions for fetchhub-1... ")
-    fet.processor.process_txs(wallet_address, elems_1, exporter, co2.FET_FETCHUB1_NODE, progress)
-
-    # fetchhub2
-    elems_2 = common.ibc.api_lcd.get_txs_all(
-        co2.FET_FETCHUB2_NODE, wallet_address, progress, max_txs, debug=localconfig.debug,
-        stage_name=progress.STAGE_FET2, events_types=EVENTS_TYPES_FET)
-    progress.report_message(f"Processing {len(elems_2)} transactions for fetchhub-2... ")
-    fet.processor.process_txs(wallet_address, elems_2, exporter, co2.FET_FETCHUB2_NODE)
-
-    # fetchhub3
-    elems_3 = common.ibc.api_lcd.get_txs_all(
-        co2.FET_FETCHUB3_NODE, wallet_address, progress, max_txs, debug=localconfig.debug,
-        stage_name=progress.STAGE_FET3, events_types=EVENTS_TYPES_FET)
-    progress.report_message(f"Processing {len(elems_3)} transactions for fetchhub-3... ")
-    fet.processor.process_txs(wallet_address, elems_3, exporter, co2.FET_FETCHUB3_NODE)
-
-    # fetchhub4
-    elems_4 = common.ibc.api_lcd.get_txs_all(
-        FET_NODE, wallet_address, progress, max_txs, debug=localconfig.debug, stage_name=progress.STAGE_FET4,
-        events_types=EVENTS_TYPES_FET
-    )
-    progress.report_message(f"Processing {len(elems_4)} transactions for fetchhub-4... ")
-    fet.processor.process_txs(wallet_address, elems_4, exporter, FET_NODE)
+
+    # Each era (fetchhub-1 .. fetchhub-4) is a separate node, so query all eras concurrently
+    with ThreadPoolExecutor(max_workers=NUM_ERAS) as executor:
+        # Fetch count of pages/transactions to estimate progress more accurately
+        future_count_1 = executor.submit(
+            fet.fetchhub1.api_rpc.get_txs_pages_count, co2.FET_FETCHUB1_NODE, wallet_address, max_txs,
+            debug=localconfig.debug, events_types=EVENTS_TYPES_FET)
+        future_count_2 = executor.submit(session_fet2.pages_count)
+        future_count_3 = executor.submit(session_fet3.pages_count)
+        future_count_4 = executor.submit(session_fet4.pages_count)
+        pages_fet1, txs_fet1 = future_count_1.result()
+        progress.set_estimate_fet1(pages_fet1, txs_fet1)
+        progress.set_estimate_fet2(future_count_2.result())
+        progress.set_estimate_fet3(future_count_3.result())
+        progress.set_estimate_fet4(future_count_4.result())
+
+        # Fetch transactions of all eras (worker threads queue progress reports; main thread applies them)
+        fetch_progress = QueuedProgress()
+        future_elems_1 = executor.submit(
+            fet.fetchhub1.api_rpc.get_txs_all, co2.FET_FETCHUB1_NODE, wallet_address, fetch_progress, max_txs,
+            debug=localconfig.debug, stage_name=progress.STAGE_FET1_PAGES, events_types=EVENTS_TYPES_FET)
+        future_elems_2 = executor.submit(session_fet2.get_txs_all, fetch_progress, stage_name=progress.STAGE_FET2)
+        future_elems_3 = executor.submit(session_fet3.get_txs_all, fetch_progress, stage_name=progress.STAGE_FET3)
+        future_elems_4 = executor.submit(session_fet4.get_txs_all, fetch_progress, stage_name=progress.STAGE_FET4)
+
+        # Process transactions in era order (each era as soon as its fetch completes)
+
+        # fetchhub1
+        elems_1 = fetch_progress.result(future_elems_1, progress)
+        # Update to more accurate estimate after removing duplicates
+        progress.stages[progress.STAGE_FET1_TXS].total_tasks = len(elems_1)
+        progress.report_message(f"Processing {len(elems_1)} transactions for fetchhub-1... ")
+        fet.processor.process_txs(wallet_address, elems_1, exporter, co2.FET_FETCHUB1_NODE, progress)
+
+        # fetchhub2
+        elems_2 = fetch_progress.result(future_elems_2, progress)
+        progress.report_message(f"Processing {len(elems_2)} transactions for fetchhub-2... ")
+        fet.processor.process_txs(wallet_address, elems_2, exporter, co2.FET_FETCHUB2_NODE)
+
+        # fetchhub3
+        elems_3 = fetch_progress.result(future_elems_3, progress)
+        progress.report_message(f"Processing {len(elems_3)} transactions for fetchhub-3... ")
+        fet.processor.process_txs(wallet_address, elems_3, exporter, co2.FET_FETCHUB3_NODE)
+
+        # fetchhub4
+        elems_4 = fetch_progress.result(future_elems_4, progress)
+        progress.report_message(f"Processing {len(elems_4)} transactions for fetchhub-4... ")
+        fet.processor.process_txs(wallet_address, elems_4, exporter, FET_NODE)
 
     if localconfig.cache:
         Cache().set_ibc_addresses(localconfig.ibc_addresses)
@@ -72,12 +72,13 @@ def txhistory(wallet_address, options):
     progress = ProgressJuno()
     exporter = Exporter(wallet_address, localconfig, TICKER_JUNO)
 
-    # Fetch count of transactions to estimate progress more accurately
-    count_pages = common.ibc.api_lcd.get_txs_pages_count(JUNO_NODE, wallet_address, max_txs, debug=localconfig.debug)
+    # Fetch count of transactions to estimate progress more accurately (first pages reused below)
+    session = common.ibc.api_lcd.LcdTxsSession(JUNO_NODE, wallet_address, max_txs, debug=localconfig.debug)
+    count_pages = session.pages_count()
     progress.set_estimate(count_pages)
 
     # Fetch transactions
-    elems = common.ibc.api_lcd.get_txs_all(JUNO_NODE, wallet_address, progress, max_txs, debug=localconfig.debug)
+    elems = session.get_txs_all(progress)
 
     progress.report_message(f"Processing {len(elems)} transactions... ")
     juno.processor.process_txs(wallet_address, elems, exporter)
@@ -25,8 +25,10 @@ from common.ExporterTypes import FORMAT_DEFAULT, LP_TREATMENT_TRANSFERS
 from settings_csv import TICKER_LUNA1
 from luna1.api_fcd import LIMIT_FCD, FcdAPI
 from luna1.api_lcd import LcdAPI
+from luna1 import util_terra
 from luna1.config_luna1 import localconfig
 from luna1.progress_terra import SECONDS_PER_TX, ProgressTerra
+from luna1.txs_checkpoint import TxsCheckpoint
 
 
 def main():
@@ -101,6 +103,10 @@ def txhistory(wallet_address, options):
     elems = _get_txs(wallet_address, progress)
     elems.sort(key=lambda elem: elem["timestamp"])
 
+    # Fetch info of all referenced contracts up front (deduplicated, concurrent)
+    progress.report_message("Fetching contract info...")
+    util_terra.prefetch_contracts(elems)
+
     # Create rows for CSV
     luna1.processor.process_txs(wallet_address, elems, exporter, progress)
 
@@ -131,9 +137,14 @@ def _cache_push(cache):
 
 
 def _get_txs(wallet_address, progress):
-    offset = 0
-    out = []
-    for _ in range(_max_queries()):
+    # Resume from pages fetched by previous interrupted run, if any
+    checkpoint = TxsCheckpoint(wallet_address)
+    out, offset, num_pages = checkpoint.load()
+
+    for _ in range(num_pages, _max_queries()):
+        if num_pages and not offset:
+            # Last page already fetched
+            break
         num_tx = len(out)
         progress.report(num_tx, f"Retrieving transaction {num_tx + 1} ...")
 
@@ -141,13 +152,16 @@ def _get_txs(wallet_address, progress):
         result = data["txs"]
         out.extend(result)
 
-        if data.get("next", None):
-            offset = data["next"]
-        else:
+        offset = data.get("next", None)
+        num_pages += 1
+        checkpoint.add_page(result, offset)
+        if not offset:
             break
 
+    checkpoint.remove()
     message = f"Retrieved total {len(out)} txids..."
     progress.report_message(message)
+    logging.info("fcd stats: %s", FcdAPI.stats())
 
     return out
 
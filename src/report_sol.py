@@ -7,26 +7,32 @@ Prints transactions and writes CSV(s) to _reports/SOL*.csv
 import json
 import logging
 import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from json.decoder import JSONDecodeError
 
 import sol.processor
 from common import report_util
 from common.Cache import Cache
 from common.ErrorCounter import ErrorCounter
+from common.HandlerStats import HandlerStats
 from common.Exporter import Exporter
 from common.ExporterTypes import FORMAT_DEFAULT
 from settings_csv import MESSAGE_ADDRESS_NOT_FOUND, MESSAGE_STAKING_ADDRESS_FOUND, SOL_NODE, TICKER_SOL
 from sol import staking_rewards
-from sol.api_rpc import RpcAPI
+from sol.api_rpc import SECONDS_PER_DAY, RpcAPI
+from sol.block_times import BlockTimeDB
 from sol.config_sol import localconfig
 from sol.constants import PROGRAMID_STAKE
 from sol.progress_sol import SECONDS_PER_STAKING_ADDRESS, SECONDS_PER_TX, ProgressSol
+from sol.sync_state import SyncState
 from sol.TxInfoSol import WalletInfo
 from sol.config_sol import localconfig
 
 LIMIT_PER_QUERY = 1000
 RPC_TIMEOUT = 600  # seconds
 ABSOLUTE_MAX_QUERIES = 100
+SEEK_MAX_SLOTS = 20
 
 
 def main():
@@ -46,6 +52,8 @@ def main():
 def _read_options(options):
     report_util.read_common_options(localconfig, options)
     localconfig.start_date = options.get("start_date", None)
+    localconfig.end_date = options.get("end_date", None)
+    localconfig.incremental = options.get("incremental", False)
     logging.info("localconfig: %s", localconfig.__dict__)
 
 
@@ -129,8 +137,11 @@ def txhistory(wallet_address, options):
 
     # Fetch data to so that job progress can be estimated ##########
 
+    # Previous run results (incremental mode only)
+    state = SyncState.load(wallet_address, min_date, localconfig.end_date) if localconfig.incremental else None
+
     # Fetch transaction ids for wallet
-    txids = _txids(wallet_address, progress, min_date)
+    txids = _txids(wallet_address, progress, min_date, state)
 
     # Fetch current staking addresses for wallet
     progress.report_message("Fetching staking addresses...")
@@ -143,15 +154,29 @@ def txhistory(wallet_address, options):
     #################################################################
 
     # Transactions data
+    if state:
+        for row in state.rows:
+            exporter.ingest_row(row)
+        for addr in state.staking_addresses:
+            wallet_info.add_staking_address(addr)
     _fetch_and_process_txs(txids, wallet_info, exporter, progress)
 
+    if state:
+        # Save transactions results (before staking rewards, which are always recomputed)
+        state.txids.update(txids)
+        state.rows = list(exporter.rows)
+        state.staking_addresses = set(wallet_info.get_staking_addresses())
+        state.save()
+
     # Update progress indicator
     progress.update_estimate(len(wallet_info.get_staking_addresses()))
 
     # Staking rewards data
-    staking_rewards.reward_txs(wallet_info, exporter, progress, min_date)
+    staking_rewards.reward_txs(wallet_info, exporter, progress, min_date, localconfig.end_date)
 
     ErrorCounter.log(TICKER_SOL, wallet_address)
+    HandlerStats.log(TICKER_SOL, wallet_address)
+    logging.info("rpc stats: %s", RpcAPI.stats())
     if localconfig.cache:
         # Flush cache to db
         Cache().set_sol_blocks(localconfig.blocks)
@@ -159,59 +184,108 @@ def txhistory(wallet_address, options):
     return exporter
 
 
-def _query_txids(addresses, progress, min_date=None):
-    """ Returns transactions txid's across all token account addresses """
-    max_txs = localconfig.limit
+def _query_txids(addresses, progress, min_date=None, state=None):
+    """ Returns transactions txid's across all token account addresses
 
-    out = []
-    txids_seen = set()
-    for i, address in enumerate(addresses):
-        if progress and i % 10 == 0:
-            message = f"Fetched txids for {i} of {len(addresses)} addresses..."
-            progress.report_message(message)
+    If state (incremental mode) is specified, only returns txids newer than state.high_water_marks that were not
+    already processed, and updates state.high_water_marks.
+    """
+    high_water_marks = state.high_water_marks if state else {}
+    max_date = localconfig.end_date
+    txids_by_address = [None] * len(addresses)
 
-        # Get transaction txids for this token account
-        before = None
-        for j in range(ABSOLUTE_MAX_QUERIES):
-            logging.info("query %s for address=%s", j, address)
+    # Start paging from end_date, instead of newest transaction
+    before = _seek_before(max_date) if max_date else None
 
-            txids, before = RpcAPI.get_txids(address, limit=LIMIT_PER_QUERY, before=before, min_date=min_date)
+    # Fetch txids for each address concurrently
+    with ThreadPoolExecutor(max_workers=localconfig.fetch_workers) as executor:
+        futures = {
+            executor.submit(
+                _query_txids_address, address, min_date, high_water_marks.get(address), before, max_date): i
+            for i, address in enumerate(addresses)
+        }
+        for count, future in enumerate(as_completed(futures)):
+            if progress and count % 10 == 0:
+                message = f"Fetched txids for {count} of {len(addresses)} addresses..."
+                progress.report_message(message)
 
-            for txid in txids:
-                # Remove duplicate txids
-                if txid not in txids_seen:
-                    out.append(txid)
-                    txids_seen.add(txid)
+            txids_by_address[futures[future]] = future.result()
 
-            # No more transactions
-            if before is None:
-                break
+    # Merge in order of addresses, so that result does not depend on completion order
+    out = []
+    txids_seen = set(state.txids) if state else set()
+    for address, txids in zip(addresses, txids_by_address):
+        if state and txids:
+            high_water_marks[address] = txids[0]
 
-            # Reached max transaction limit
-            if len(txids) > max_txs:
-                break
+        for txid in txids:
+            # Remove duplicate txids
+            if txid not in txids_seen:
+                out.append(txid)
+                txids_seen.add(txid)
 
     # Process oldest first
     out.reverse()
     return out
 
 
-def _txids(wallet_address, progress, min_date):
+def _query_txids_address(address, min_date, until=None, before=None, max_date=None):
+    """ Returns transaction txid's for one address (newest first), newer than until and older than before
+    if specified """
+    max_txs = localconfig.limit
+
+    out = []
+    for j in range(ABSOLUTE_MAX_QUERIES):
+        logging.info("query %s for address=%s", j, address)
+
+        txids, before = RpcAPI.get_txids(
+            address, limit=LIMIT_PER_QUERY, before=before, min_date=min_date, until=until, max_date=max_date)
+        out.extend(txids)
+
+        # No more transactions
+        if before is None:
+            break
+
+        # Reached max transaction limit
+        if len(txids) > max_txs:
+            break
+
+    return out
+
+
+def _seek_before(max_date):
+    """ Returns signature of a transaction shortly after max_date (to use as 'before' anchor), or None """
+    ts = RpcAPI._unix_timestamp(max_date) + SECONDS_PER_DAY
+    slot = BlockTimeDB.find_slot(ts)
+    if slot is None:
+        return None
+
+    # Use first transaction of first non-empty block at/after slot
+    for cur in range(slot, slot + SEEK_MAX_SLOTS):
+        signature = RpcAPI.get_block_signature(cur)
+        if signature:
+            logging.info("Paging transactions from slot=%s for end_date=%s", cur, max_date)
+            return signature
+
+    logging.warning("Unable to find transaction signature near end_date=%s", max_date)
+    return None
+
+
+def _txids(wallet_address, progress, min_date, state=None):
     # Sometimes, transactions do not all appear under main wallet address when querying transaction history.
     # So retrieve token addresses too.
     addresses = [wallet_address]
     token_accounts = RpcAPI.fetch_token_accounts(wallet_address).keys()
     addresses.extend(token_accounts)
 
-    out = _query_txids(addresses, progress, min_date)
+    out = _query_txids(addresses, progress, min_date, state)
     return out
 
 
 def _fetch_and_process_txs(txids, wallet_info, exporter, progress):
     total_count = len(txids)
 
-    for i, txid in enumerate(txids):
-        elem = RpcAPI.fetch_tx(txid)
+    for i, (txid, elem) in enumerate(_prefetch_txs(txids)):
         sol.processor.process_tx(wallet_info, exporter, txid, elem)
 
         if i % 10 == 0:
@@ -223,6 +297,29 @@ def _fetch_and_process_txs(txids, wallet_info, exporter, progress):
     progress.report(total_count, message, "txs")
 
 
+def _prefetch_txs(txids):
+    """ Yields (txid, data) in order of txids, while worker threads fetch upcoming batches in the background.
+
+    At most localconfig.prefetch_depth batches are fetched ahead of the consumer.
+    """
+    batch_size = localconfig.rpc_batch_size
+    batches = (txids[i:i + batch_size] for i in range(0, len(txids), batch_size))
+
+    with ThreadPoolExecutor(max_workers=localconfig.fetch_workers) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append((batch, executor.submit(RpcAPI.fetch_txs, batch)))
+            if len(pending) < localconfig.prefetch_depth:
+                continue
+
+            batch_done, future = pending.popleft()
+            yield from zip(batch_done, future.result())
+
+        while pending:
+            batch_done, future = pending.popleft()
+            yield from zip(batch_done, future.result())
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     main()
@@ -24,6 +24,8 @@ LUNA2_LCD_NODE = os.environ.get("LUNA2_LCD_NODE", "https://phoenix-lcd.terra.dev
 
 # Optional environment variables
 COVALENT_API_KEY = os.environ.get("COVALENT_API_KEY", "")
+IBC_BLOCK_TIMES_DB = os.environ.get("IBC_BLOCK_TIMES_DB", "")
+SOL_MAX_REQUESTS_PER_SECOND = os.environ.get("SOL_MAX_REQUESTS_PER_SECOND", "")
 
 # #############################################################################
 
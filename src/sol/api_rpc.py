@@ -4,13 +4,24 @@ import time
 from datetime import datetime, timezone
 
 import requests
-from settings_csv import SOL_NODE, REPORTS_DIR
+from common.RateLimiter import RateLimiter
+from settings_csv import SOL_MAX_REQUESTS_PER_SECOND, SOL_NODE, REPORTS_DIR
 from sol.constants import BILLION, PROGRAMID_STAKE, PROGRAMID_TOKEN_ACCOUNTS
 from sol.config_sol import localconfig
+from sol.tx_store import TxStore
 from common.debug_util import use_debug_files
 
 TOKEN_ACCOUNTS = {}
 
+# Requests per second (adjusted at runtime based on rate limit errors and latency)
+RATE_MAINNET_BETA = 3
+RATE_DEFAULT = 10
+RATE_MAX = 50
+MAX_RETRIES = 5
+BACKOFF_MAX_SECONDS = 60
+INFLATION_REWARD_ADDRESSES_PER_QUERY = 100
+SECONDS_PER_DAY = 86400
+
 
 class RpcAPI(object):
     session = requests.Session()
@@ -24,30 +35,120 @@ class RpcAPI(object):
             "params": params_list,
             "id": myid
         }
+        return cls._post(data)
+
+    @classmethod
+    def _fetch_batch(cls, method, params_lists):
+        """ Sends one JSON-RPC batch request.  Returns list of results in the same order as params_lists. """
+        data = [
+            {
+                "method": method,
+                "jsonrpc": "2.0",
+                "params": params_list,
+                "id": i
+            } for i, params_list in enumerate(params_lists)
+        ]
+        results = cls._post(data)
+
+        if not isinstance(results, list):
+            # Node rejected batch request (i.e. batching unsupported).  Fall back to one request per call.
+            logging.warning("Batch request failed for method=%s.  Retrying without batching...", method)
+            return [cls._fetch(method, params_list) for params_list in params_lists]
+
+        # Batch responses may be returned in any order
+        results_by_id = {result.get("id"): result for result in results}
+        out = []
+        for i, params_list in enumerate(params_lists):
+            result = results_by_id.get(i)
+            if result is None:
+                result = cls._fetch(method, params_list)
+            out.append(result)
+        return out
+
+    @classmethod
+    def _post(cls, data):
         headers = {}
+        limiter = cls._rate_limiter()
+        # RPC providers meter each call of a batch request
+        num_calls = len(data) if isinstance(data, list) else 1
+
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt > 0:
+                limiter.on_retry()
+            limiter.acquire(num_calls)
+
+            time_start = time.time()
+            try:
+                response = cls.session.post(SOL_NODE, json=data, headers=headers)
+            except (TimeoutError, requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # quicknode server sometimes refuses connection after hundreds of requests
+                if attempt == MAX_RETRIES:
+                    raise e
+                s = cls._backoff_seconds(attempt)
+                logging.warning("Returned timeout.  Sleeping %s seconds and retrying...", s)
+                time.sleep(s)
+                continue
 
-        try:
-            response = cls.session.post(SOL_NODE, json=data, headers=headers)
+            if response.status_code == 429 or cls._is_rate_limit_exceeded(cls._json(response)):
+                limiter.on_rate_limited()
+                if attempt == MAX_RETRIES:
+                    break
+                s = cls._retry_after_seconds(response) or cls._backoff_seconds(attempt)
+                logging.warning("Rate limit exceeded.  Sleeping %s seconds and retrying...", s)
+                time.sleep(s)
+                continue
 
-        except TimeoutError:
-            # quicknode server sometimes refuses connection after hundreds of requests
-            s = random.randint(60, 180)
-            logging.warning("Returned timeout.  Sleeping %s seconds and retrying once...", s)
-            time.sleep(s)
-            response = cls.session.post(SOL_NODE, json=data, headers=headers)
+            limiter.on_success(time.time() - time_start)
+            break
 
-        result = response.json()
+        result = cls._json(response)
+        if result is None:
+            return {"error": {"code": response.status_code, "message": response.text}}
+        return result
 
-        if "api.mainnet-beta.solana.com" in SOL_NODE:
+    @classmethod
+    def _rate_limiter(cls):
+        if SOL_MAX_REQUESTS_PER_SECOND:
+            max_rate = float(SOL_MAX_REQUESTS_PER_SECOND)
+            rate = max_rate
+        elif "api.mainnet-beta.solana.com" in SOL_NODE:
             # mainnet: a bit slower to avoid rate-limiting errors
-            time.sleep(0.3)
+            max_rate = RATE_MAINNET_BETA
+            rate = RATE_MAINNET_BETA
         else:
-            time.sleep(0.1)
+            max_rate = RATE_MAX
+            rate = RATE_DEFAULT
+        return RateLimiter.for_key(SOL_NODE, rate, max_rate=max_rate)
 
-        return result
+    @classmethod
+    def stats(cls):
+        """ Returns throttle/retry statistics for SOL_NODE """
+        return cls._rate_limiter().stats()
+
+    @classmethod
+    def _json(cls, response):
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    @classmethod
+    def _backoff_seconds(cls, attempt):
+        return min(BACKOFF_MAX_SECONDS, 2 ** attempt) + random.random()
+
+    @classmethod
+    def _retry_after_seconds(cls, response):
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
 
     @classmethod
     def _is_rate_limit_exceeded(cls, result):
+        if isinstance(result, list):
+            return any(cls._is_rate_limit_exceeded(elem) for elem in result)
+        if not isinstance(result, dict):
+            return False
         if "error" in result and "code" in result["error"] and result["error"]["code"] == 429:
             return True
         else:
@@ -67,6 +168,43 @@ class RpcAPI(object):
         date_string = datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
         return date_string
 
+    @classmethod
+    def get_block_times(cls, blocks):
+        """ Returns dict of block -> unix timestamp (None if unavailable), using batch requests """
+        blocks = [int(block) for block in blocks]
+        out = {}
+        for i in range(0, len(blocks), localconfig.rpc_batch_size):
+            chunk = blocks[i:i + localconfig.rpc_batch_size]
+            results = cls._fetch_batch("getBlockTime", [[block] for block in chunk])
+            for block, data in zip(chunk, results):
+                out[block] = data.get("result")
+        return out
+
+    @classmethod
+    def get_slot(cls):
+        params_list = [{"commitment": "finalized"}]
+        data = cls._fetch("getSlot", params_list)
+        return data["result"]
+
+    @classmethod
+    def get_block_signature(cls, slot):
+        """ Returns first transaction signature in block, or None if unavailable (i.e. skipped slot) """
+        params_list = [
+            int(slot),
+            {
+                "encoding": "json",
+                "transactionDetails": "signatures",
+                "rewards": False,
+                "maxSupportedTransactionVersion": 0
+            }
+        ]
+        data = cls._fetch("getBlock", params_list)
+
+        result = data.get("result")
+        if not result or not result.get("signatures"):
+            return None
+        return result["signatures"][0]
+
     @classmethod
     def get_block_rewards(cls, slot):
         params_list = [
@@ -121,6 +259,39 @@ class RpcAPI(object):
             pass
         return None, None
 
+    @classmethod
+    def _get_inflation_rewards(cls, staking_addresses, epoch):
+        params_list = [
+            staking_addresses,
+            {
+                "epoch": epoch
+            }
+        ]
+        data = cls._fetch("getInflationReward", params_list)
+        return data
+
+    @classmethod
+    def get_inflation_rewards(cls, staking_addresses, epoch):
+        """ Returns dict of staking_address -> (amount, slot) for staking addresses with a reward at this epoch """
+        if localconfig.debug:
+            # Debug files are written per staking address
+            results = {addr: cls.get_inflation_reward(addr, epoch) for addr in staking_addresses}
+            return {addr: result for addr, result in results.items() if result[0] is not None}
+
+        out = {}
+        for i in range(0, len(staking_addresses), INFLATION_REWARD_ADDRESSES_PER_QUERY):
+            addresses = staking_addresses[i:i + INFLATION_REWARD_ADDRESSES_PER_QUERY]
+            data = cls._get_inflation_rewards(addresses, epoch)
+
+            if not data or not data.get("result"):
+                continue
+
+            # Result list is in the same order as addresses (null for addresses without reward)
+            for addr, val in zip(addresses, data["result"]):
+                if val:
+                    out[addr] = (val["amount"] / BILLION, val["effectiveSlot"])
+        return out
+
     @classmethod
     def get_latest_epoch(cls):
         params_list = []
@@ -160,8 +331,39 @@ class RpcAPI(object):
     @classmethod
     @use_debug_files(localconfig, REPORTS_DIR)
     def fetch_tx(cls, txid):
-        params_list = [txid, {"encoding": "jsonParsed"}]
-        return cls._fetch("getConfirmedTransaction", params_list)
+        data = TxStore.get(txid)
+        if data is not None:
+            return data
+
+        params_list = cls._fetch_tx_params(txid)
+        data = cls._fetch("getConfirmedTransaction", params_list)
+        TxStore.put_many({txid: data})
+        return data
+
+    @classmethod
+    def fetch_txs(cls, txids):
+        """ Returns list of transaction data (same format as fetch_tx()) for txids, in the same order """
+        if localconfig.debug:
+            # Debug files are written per txid
+            return [cls.fetch_tx(txid) for txid in txids]
+
+        # Only fetch transactions not in local store
+        stored = TxStore.get_many(txids)
+        missing = [txid for txid in txids if txid not in stored]
+
+        batch_size = localconfig.rpc_batch_size
+        fetched = {}
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
+            params_lists = [cls._fetch_tx_params(txid) for txid in batch]
+            fetched.update(zip(batch, cls._fetch_batch("getConfirmedTransaction", params_lists)))
+        TxStore.put_many(fetched)
+
+        return [stored[txid] if txid in stored else fetched[txid] for txid in txids]
+
+    @classmethod
+    def _fetch_tx_params(cls, txid):
+        return [txid, {"encoding": "jsonParsed"}]
 
     @classmethod
     def fetch_token_accounts(cls, wallet_address):
@@ -240,10 +442,15 @@ class RpcAPI(object):
         return dt.replace(tzinfo=timezone.utc).timestamp()
 
     @classmethod
-    def get_txids(cls, wallet_address, limit=None, before=None, min_date=None):
+    def get_txids(cls, wallet_address, limit=None, before=None, min_date=None, until=None, max_date=None):
         min_date_ts = cls._unix_timestamp(min_date) if min_date else None
+        max_date_ts = cls._unix_timestamp(max_date) + SECONDS_PER_DAY if max_date else None
 
-        data = cls._get_txids(wallet_address, limit, before)
+        if until:
+            # Only txids newer than until
+            data = cls._get_txids(wallet_address, limit, before, until)
+        else:
+            data = cls._get_txids(wallet_address, limit, before)
 
         if "result" not in data or data["result"] is None:
             return [], None
@@ -264,6 +471,10 @@ class RpcAPI(object):
                 if unix_timestamp < min_date_ts:
                     return out, None
 
+            # Restrict to range (.., max_date] if max_date specified
+            if max_date_ts and info["blockTime"] >= max_date_ts:
+                continue
+
             out.append(txid)
 
         # Determine "before" argument in subsequent query: use last txid of this query
@@ -276,12 +487,14 @@ class RpcAPI(object):
 
     @classmethod
     @use_debug_files(localconfig, REPORTS_DIR)
-    def _get_txids(cls, wallet_address, limit=None, before=None):
+    def _get_txids(cls, wallet_address, limit=None, before=None, until=None):
         config = {}
         if limit:
             config["limit"] = limit
         if before:
             config["before"] = before
+        if until:
+            config["until"] = until
         params_list = [
             wallet_address,
             config
@@ -0,0 +1,90 @@
+"""
+usage: python3 -m sol.bench_parser <wallet_address> [--repeat N]
+       python3 -m sol.bench_parser --fixture ../tests/data/sol_parse_tx.json [--token_accounts N] [--repeat N]
+
+Microbenchmark for sol.parser.parse_tx().  Parses transactions recorded by a previous --debug run
+(_reports/debug.fetchtx-<txid>.json), or the transactions of a fixture file (format of
+tests/data/sol_parse_tx.json), and prints per-tx parse time.  Run before/after a parser change to compare.
+
+--token_accounts pads the fixture wallet with extra (unused) token accounts, since per-tx cost depends on the
+number of token accounts a wallet has.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import statistics
+import time
+
+import sol.api_rpc
+from settings_csv import REPORTS_DIR
+from sol.config_sol import localconfig
+from sol.parser import parse_tx
+from sol.TxInfoSol import WalletInfo
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wallet_address", nargs="?")
+    parser.add_argument("--fixture")
+    parser.add_argument("--token_accounts", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    if args.fixture:
+        with open(args.fixture, "r") as f:
+            data = json.load(f)
+        args.wallet_address = data["wallet_address"]
+        token_accounts = _pad_token_accounts(data["token_accounts"], args.token_accounts)
+        sol.api_rpc.TOKEN_ACCOUNTS[args.wallet_address] = token_accounts
+        fixtures = data["txs"]
+    elif args.wallet_address:
+        # Read token accounts from debug file recorded in same --debug run
+        localconfig.debug = True
+        fixtures = _load_fixtures()
+    else:
+        parser.error("wallet_address or --fixture required")
+
+    if not fixtures:
+        print(f"No recorded transactions found in {REPORTS_DIR}.  Run report_sol.py with --debug first.")
+        return
+
+    # Warm up (loads token accounts, tickers index)
+    for txid, data in fixtures:
+        parse_tx(txid, data, WalletInfo(args.wallet_address))
+
+    timings = []
+    for txid, data in fixtures:
+        time_start = time.perf_counter()
+        for _ in range(args.repeat):
+            parse_tx(txid, data, WalletInfo(args.wallet_address))
+        timings.append((time.perf_counter() - time_start) / args.repeat)
+
+    print(f"transactions: {len(fixtures)}")
+    print(f"per-tx mean:   {statistics.mean(timings) * 1e6:.1f} us")
+    print(f"per-tx median: {statistics.median(timings) * 1e6:.1f} us")
+    print(f"per-tx max:    {max(timings) * 1e6:.1f} us")
+
+
+def _pad_token_accounts(token_accounts, count):
+    out = dict(token_accounts)
+    mints = sorted(set(info["mint"] for info in token_accounts.values()))
+    for i in range(len(out), count):
+        out["PaddedTokenAccount{}".format(i)] = {"mint": mints[i % len(mints)], "decimals": 6}
+    return out
+
+
+def _load_fixtures():
+    out = []
+    for path in sorted(glob.glob(f"{REPORTS_DIR}/debug.fetchtx-*.json")):
+        txid = os.path.basename(path)[len("debug.fetchtx-"):-len(".json")]
+        with open(path, "r") as f:
+            out.append((txid, json.load(f)))
+    return out
+
+
+if __name__ == "__main__":
+    main()
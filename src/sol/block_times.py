@@ -0,0 +1,160 @@
+"""
+Local persistent store of slot -> block time (unix timestamp), shared across runs and processes.
+
+Block times never change once a slot is finalized, so rows are only ever appended.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+
+from sol.api_rpc import RpcAPI
+
+DATADIR = os.path.dirname(os.path.realpath(__file__)) + "/data_staking_rewards"
+MAX_VARIABLES_PER_QUERY = 500
+SECONDS_PER_SLOT = 0.4  # approximate (lower bound), for initial search step
+SLOTS_PER_PROBE = 10  # consecutive slots queried per probe, since skipped slots have no block time
+SLOT_TOLERANCE = 1000  # find_slot() precision
+
+
+class BlockTimeDB:
+
+    path = DATADIR + "/block_times.db"
+    conn = None
+    lock = threading.Lock()
+
+    @classmethod
+    def _conn(cls):
+        if cls.conn is None:
+            # WAL mode allows concurrent readers while another process appends
+            cls.conn = sqlite3.connect(cls.path, check_same_thread=False, timeout=30)
+            cls.conn.execute("PRAGMA journal_mode=WAL")
+            cls.conn.execute("CREATE TABLE IF NOT EXISTS block_times (slot INTEGER PRIMARY KEY, ts INTEGER)")
+        return cls.conn
+
+    @classmethod
+    def get(cls, slot):
+        """ Returns unix timestamp of slot if stored, else None """
+        return cls.get_many([slot]).get(int(slot))
+
+    @classmethod
+    def get_many(cls, slots):
+        """ Returns dict of slot -> unix timestamp for slots found in store """
+        slots = list(set(int(slot) for slot in slots))
+        out = {}
+        with cls.lock:
+            conn = cls._conn()
+            for i in range(0, len(slots), MAX_VARIABLES_PER_QUERY):
+                chunk = slots[i:i + MAX_VARIABLES_PER_QUERY]
+                query = "SELECT slot, ts FROM block_times WHERE slot IN ({})".format(",".join("?" * len(chunk)))
+                out.update(conn.execute(query, chunk).fetchall())
+        return out
+
+    @classmethod
+    def add_many(cls, block_times):
+        """ Appends dict of slot -> unix timestamp to store (existing slots are left unchanged) """
+        with cls.lock:
+            conn = cls._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO block_times VALUES (?, ?)",
+                    ((int(slot), int(ts)) for slot, ts in block_times.items() if ts is not None)
+                )
+
+    @classmethod
+    def prefill(cls, slots):
+        """ Fetches block times of all slots missing from store, in bulk.  Returns dict of slot -> unix timestamp """
+        slots = set(int(slot) for slot in slots)
+        out = cls.get_many(slots)
+
+        missing = sorted(slots - set(out.keys()))
+        if missing:
+            logging.info("Fetching block times for %s slots...", len(missing))
+            fetched = RpcAPI.get_block_times(missing)
+            cls.add_many(fetched)
+            out.update((slot, ts) for slot, ts in fetched.items() if ts is not None)
+        return out
+
+    @classmethod
+    def estimate(cls, slot):
+        """ Returns unix timestamp of slot, interpolated from nearest stored slots when not stored exactly.
+
+        Returns None if slot is not between two stored slots.  Use only where approximate time is acceptable.
+        """
+        slot = int(slot)
+        with cls.lock:
+            conn = cls._conn()
+            lower = conn.execute(
+                "SELECT slot, ts FROM block_times WHERE slot <= ? ORDER BY slot DESC LIMIT 1", (slot,)).fetchone()
+            upper = conn.execute(
+                "SELECT slot, ts FROM block_times WHERE slot >= ? ORDER BY slot ASC LIMIT 1", (slot,)).fetchone()
+
+        if lower and lower[0] == slot:
+            return lower[1]
+        if not lower or not upper:
+            return None
+
+        (slot_lo, ts_lo), (slot_hi, ts_hi) = lower, upper
+        return int(ts_lo + (ts_hi - ts_lo) * (slot - slot_lo) / (slot_hi - slot_lo))
+
+    @classmethod
+    def find_slot(cls, ts):
+        """ Returns a slot with block time at or after ts, at most ~SLOT_TOLERANCE slots after the first such slot.
+
+        Uses exponential steps back from the latest slot (or from a slot guessed from stored block times), then binary
+        search.  Returns None if ts is not in the past.
+        """
+        hi = RpcAPI.get_slot()
+        hi, ts_hi = cls._probe(hi)
+        if ts_hi is None or ts_hi < ts:
+            return None
+
+        # Start from slot guessed from stored block times, if any (approximate: confirmed by probe)
+        guess = cls._guess_slot(ts, hi, ts_hi)
+        if guess is not None and guess + SLOT_TOLERANCE < hi:
+            slot, ts_slot = cls._probe(guess + SLOT_TOLERANCE)
+            if ts_slot is not None and ts_slot >= ts:
+                hi, ts_hi = slot, ts_slot
+
+        # Step back exponentially until a slot before ts is found
+        step = max(SLOT_TOLERANCE, int((ts_hi - ts) / SECONDS_PER_SLOT))
+        while True:
+            lo = max(0, hi - step)
+            _, ts_lo = cls._probe(lo)
+            if lo == 0 or ts_lo is None or ts_lo < ts:
+                # Slots unavailable (i.e. before node history) are treated as before ts
+                break
+            hi = lo
+            step *= 2
+
+        # Binary search between lo (before ts) and hi (at/after ts)
+        while hi - lo > SLOT_TOLERANCE:
+            mid = (lo + hi) // 2
+            slot, ts_mid = cls._probe(mid)
+            if ts_mid is None or ts_mid < ts:
+                lo = mid
+            else:
+                hi = slot
+        return hi
+
+    @classmethod
+    def _guess_slot(cls, ts, slot_latest, ts_latest):
+        """ Returns slot estimated to have block time ts, or None if stored block times do not cover it """
+        step = int((ts_latest - ts) / SECONDS_PER_SLOT)
+        ts_step = cls.estimate(slot_latest - step)
+        if ts_step is None or ts_step >= ts_latest:
+            return None
+
+        # Scale step by actual time per slot around the estimate
+        return slot_latest - int(step * (ts_latest - ts) / (ts_latest - ts_step))
+
+    @classmethod
+    def _probe(cls, slot):
+        """ Returns (slot, unix timestamp) of first slot with a block time in [slot, slot + SLOTS_PER_PROBE) """
+        slots = range(slot, slot + SLOTS_PER_PROBE)
+        block_times = cls.prefill(slots)
+        for cur in slots:
+            if cur in block_times:
+                return cur, block_times[cur]
+        return None, None
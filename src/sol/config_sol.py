@@ -6,3 +6,8 @@ class localconfig(config):
     blocks = {}
     limit = 5000  # max txs
     start_date = None
+    end_date = None
+    incremental = False
+    rpc_batch_size = 25  # max calls per JSON-RPC batch request
+    fetch_workers = 4  # threads for concurrent rpc queries
+    prefetch_depth = 8  # max batches fetched ahead of processing
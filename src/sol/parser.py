@@ -2,6 +2,7 @@
 Data parsing functions applicable to all transactions
 """
 
+import itertools
 import logging
 import re
 from datetime import datetime, timezone
@@ -14,6 +15,9 @@ from sol.TxInfoSol import TxInfoSol
 from sol.handle_transfer import is_transfer
 import sol.util_sol
 
+# Cache of wallet_address -> (account_to_mint, mints) for wallet token accounts
+WALLET_MINTS = {}
+
 
 def parse_tx(txid, data, wallet_info):
     """ Parses data returned by RcpAPI.fetch_tx().  Returns TxInfoSol object """
@@ -46,23 +50,27 @@ def parse_tx(txid, data, wallet_info):
     timestamp = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S") if ts else ""
     instructions = data["result"]["transaction"]["message"].get("instructions", [])
 
+    # Tables shared by all derived fields below (built once per transaction)
+    account_keys = [row["pubkey"] for row in data["result"]["transaction"]["message"]["accountKeys"]]
+    token_accounts = RpcAPI.fetch_token_accounts(wallet_address)
+
     txinfo = TxInfoSol(txid, timestamp, "", wallet_address)
 
     txinfo.fee_blockchain = float(result["meta"]["fee"]) / BILLION
     txinfo.instructions = instructions
-    txinfo.instruction_types = _instruction_types(instructions)
-    txinfo.program_ids = [x["programId"] for x in txinfo.instructions]
-    txinfo.input_accounts = _input_accounts(instructions)
+    txinfo.instruction_types, txinfo.program_ids, txinfo.input_accounts, staking_addresses = _scan_instructions(
+        instructions, wallet_address)
 
     txinfo.inner = _extract_inner_instructions(data)
     txinfo.inner_parsed = _inner_parsed(txinfo.inner)
 
     txinfo.log_instructions, txinfo.log, txinfo.log_string = _log_messages(txid, data)
 
-    txinfo.wallet_accounts = _wallet_accounts(txid, wallet_address, txinfo.instructions, txinfo.inner)
-    txinfo.account_to_mint, txinfo.mints = _mints(data, wallet_address)
+    txinfo.wallet_accounts = _wallet_accounts(txid, wallet_address, txinfo.instructions, txinfo.inner, token_accounts)
+    txinfo.account_to_mint, txinfo.mints = _mints(data, wallet_address, account_keys, token_accounts)
 
-    txinfo.balance_changes_all, txinfo.balance_changes_wallet = _balance_changes(data, txinfo.wallet_accounts, txinfo.mints)
+    txinfo.balance_changes_all, txinfo.balance_changes_wallet = _balance_changes(
+        data, txinfo.wallet_accounts, txinfo.mints, account_keys)
     txinfo.transfers = _transfers(txinfo.balance_changes_wallet)
     txinfo.transfers_net, txinfo.fee = _transfers_net(txinfo, txinfo.transfers)
 
@@ -71,27 +79,41 @@ def parse_tx(txid, data, wallet_info):
         txinfo, txinfo.lp_transfers, mint_to=True)
 
     # Update wallet_info with any staking addresses found
-    addresses = _staking_addresses_found(wallet_address, txinfo.instructions)
-    for address in addresses:
+    for address in staking_addresses:
         wallet_info.add_staking_address(address)
 
     return txinfo
 
 
-def _staking_addresses_found(wallet_address, instructions):
-    out = []
+def _scan_instructions(instructions, wallet_address):
+    """ Single pass over instructions.  Returns
+    instruction_types: list of (<instruction_type>, <program>)
+    program_ids: list of program ids
+    input_accounts: list of accounts lists (for instructions with accounts)
+    staking_addresses: list of stake accounts delegated by wallet_address
+    """
+    instruction_types = []
+    program_ids = []
+    input_accounts = []
+    staking_addresses = []
+
     for instruction in instructions:
         parsed = instruction.get("parsed", None)
         instruction_type = parsed.get("type", None) if (parsed and type(parsed) is dict) else None
         program = instruction.get("program")
 
+        instruction_types.append((instruction_type, program))
+        program_ids.append(instruction["programId"])
+        if "accounts" in instruction:
+            input_accounts.append(instruction["accounts"])
+
         if (program == PROGRAM_STAKE and instruction_type == INSTRUCTION_TYPE_DELEGATE):
             stake_account = parsed["info"]["stakeAccount"]
             stake_authority = parsed["info"]["stakeAuthority"]
             if stake_authority == wallet_address:
-                out.append(stake_account)
+                staking_addresses.append(stake_account)
 
-    return out
+    return instruction_types, program_ids, input_accounts, staking_addresses
 
 
 def _has_empty_token_balances(data, mints):
@@ -117,33 +139,29 @@ def _transfers(balance_changes):
     return transfers_in, transfers_out, []
 
 
-def _balance_changes(data, wallet_accounts, mints):
-    balance_changes_sol = _balance_changes_sol(data)
-    balance_changes_tokens = _balance_changes_tokens(data, mints)
+def _balance_changes(data, wallet_accounts, mints, account_keys):
+    balance_changes_sol = _balance_changes_sol(data, account_keys)
+    balance_changes_tokens = _balance_changes_tokens(data, mints, account_keys)
 
-    balance_changes = dict(balance_changes_sol)
-    balance_changes.update(dict(balance_changes_tokens))
+    balance_changes = balance_changes_sol
+    balance_changes.update(balance_changes_tokens)
 
     balance_changes_wallet = {k: v for (k, v) in balance_changes.items() if k in wallet_accounts}
     return balance_changes, balance_changes_wallet
 
 
-def _balance_changes_tokens(data, mints):
-    account_keys = [row["pubkey"] for row in data["result"]["transaction"]["message"]["accountKeys"]]
-
+def _balance_changes_tokens(data, mints, account_keys):
     post_token_balances = data["result"]["meta"]["postTokenBalances"]
     pre_token_balances = data["result"]["meta"]["preTokenBalances"]
 
     a = {}
-    b = {}
     balance_changes = {}
-    for row in pre_token_balances:
-        account_address, currency_a, amount_a, _ = _row_to_amount_currency(row, account_keys, mints)
+    pre_rows = [_row_to_amount_currency(row, account_keys, mints) for row in pre_token_balances]
+    for account_address, currency_a, amount_a, _ in pre_rows:
         a[account_address] = (currency_a, amount_a)
 
     for row in post_token_balances:
         account_address, currency_b, amount_b, decimals = _row_to_amount_currency(row, account_keys, mints)
-        b[account_address] = (currency_b, amount_b)
 
         # calculate change in balance
         currency_a, amount_a = a.get(account_address, (currency_b, 0.0))
@@ -153,8 +171,7 @@ def _balance_changes_tokens(data, mints):
         balance_changes[account_address] = (currency_a, amount_change)
 
     # Handle case where post_token_balance doesn't exist for token (aka zero balance)
-    for row in pre_token_balances:
-        account_address, currency_a, amount_a, _ = _row_to_amount_currency(row, account_keys, mints)
+    for account_address, currency_a, amount_a, _ in pre_rows:
         if account_address not in balance_changes:
             balance_changes[account_address] = (currency_a, -amount_a)
 
@@ -173,15 +190,13 @@ def _row_to_amount_currency(row, account_keys, mints):
     return account_address, currency, amount, decimals
 
 
-def _balance_changes_sol(data):
-    account_keys = [row["pubkey"] for row in data["result"]["transaction"]["message"]["accountKeys"]]
-
+def _balance_changes_sol(data, account_keys):
     post_balances_sol = data["result"]["meta"]["postBalances"]
     pre_balances_sol = data["result"]["meta"]["preBalances"]
 
     balance_changes = {}
-    for i, account_address in enumerate(account_keys):
-        amount = (float(post_balances_sol[i]) - float(pre_balances_sol[i])) / BILLION
+    for account_address, post, pre in zip(account_keys, post_balances_sol, pre_balances_sol):
+        amount = (float(post) - float(pre)) / BILLION
         amount = round(amount, 9)
         if amount != 0:
             balance_changes[account_address] = (CURRENCY_SOL, amount)
@@ -189,68 +204,53 @@ def _balance_changes_sol(data):
     return balance_changes
 
 
-def _wallet_accounts(txid, wallet_address, instructions, inner):
-    token_accounts = RpcAPI.fetch_token_accounts(wallet_address)
-    accounts_wallet = set(token_accounts.keys())
-
-    accounts_instruction = _instruction_accounts(txid, wallet_address, instructions, inner)
-
-    accounts = set(accounts_instruction)
-    accounts = accounts.union(accounts_wallet)
+def _wallet_accounts(txid, wallet_address, instructions, inner, token_accounts):
+    accounts = _instruction_accounts(txid, wallet_address, instructions, inner)
+    accounts.update(token_accounts.keys())
     return accounts
 
 
-def _instruction_types(instructions):
-    out = []
-    for instruction in instructions:
-        parsed = instruction.get("parsed", None)
-        instruction_type = parsed.get("type", None) if (parsed and type(parsed) is dict) else None
-        program = instruction.get("program")
-        out.append((instruction_type, program))
-    return out
-
-
-def _input_accounts(instructions):
-    out = []
-    for instruction in instructions:
-        if "accounts" in instruction:
-            out.append(instruction["accounts"])
-    return out
-
-
-def _mints(data, wallet_address):
+def _mints(data, wallet_address, account_keys, token_accounts):
     """ Returns
     account_to_mints: dict of <account_address> -> <mint_address>
     mints: dict of <mint_address> -> { "currency" : <ticker>, "decimals" : <decimals> }
     """
-
-    # ## Get mints of wallet token accounts
-    token_accounts = RpcAPI.fetch_token_accounts(wallet_address)
-    out = dict(token_accounts)
+    # ## Get mints of wallet token accounts (same for every transaction of this wallet)
+    account_to_mint, mints = _wallet_mints(wallet_address, token_accounts)
+    account_to_mint = dict(account_to_mint)
+    mints = dict(mints)
 
     # ## Get mints of accounts found in preTokenBalances and postTokenBalances
+    for balances in (data["result"]["meta"]["preTokenBalances"], data["result"]["meta"]["postTokenBalances"]):
+        for info in balances:
+            mint = info["mint"]
+            decimals = info["uiTokenAmount"]["decimals"]
+
+            account_to_mint[account_keys[info["accountIndex"]]] = mint
+            if mint not in mints or mints[mint]["decimals"] != decimals:
+                mints[mint] = {
+                    "currency": Tickers.get(mint),
+                    "decimals": decimals
+                }
 
-    # Get account addresses
-    accounts = [d["pubkey"] for d in data["result"]["transaction"]["message"]["accountKeys"]]
+    # Add wallet_address
+    account_to_mint[wallet_address] = MINT_SOL
+    mints[MINT_SOL] = {
+        "currency": CURRENCY_SOL,
+        "decimals": 9
+    }
 
-    # Get accounts of mints found in preTokenBalances and postTokenBalances
-    mintlist = list(data["result"]["meta"]["preTokenBalances"])
-    mintlist.extend(list(data["result"]["meta"]["postTokenBalances"]))
-    for info in mintlist:
-        account_index = info["accountIndex"]
-        mint = info["mint"]
-        decimals = info["uiTokenAmount"]["decimals"]
+    return account_to_mint, mints
 
-        account = accounts[account_index]
-        out[account] = {
-            "mint": mint,
-            "decimals": decimals
-        }
 
-    # ## Repackage output format
+def _wallet_mints(wallet_address, token_accounts):
+    """ Returns (account_to_mint, mints) for wallet token accounts (cached per wallet) """
+    if wallet_address in WALLET_MINTS:
+        return WALLET_MINTS[wallet_address]
+
     account_to_mint = {}
     mints = {}
-    for account_address, info in out.items():
+    for account_address, info in token_accounts.items():
         mint = info["mint"]
         decimals = info["decimals"]
 
@@ -260,13 +260,7 @@ def _mints(data, wallet_address):
             "decimals": decimals
         }
 
-    # Add wallet_address
-    account_to_mint[wallet_address] = MINT_SOL
-    mints[MINT_SOL] = {
-        "currency": CURRENCY_SOL,
-        "decimals": 9
-    }
-
+    WALLET_MINTS[wallet_address] = (account_to_mint, mints)
     return account_to_mint, mints
 
 
@@ -306,10 +300,9 @@ def _inner_parsed(inner_instructions):
 def _instruction_accounts(txid, wallet_address, instructions, inner):
     accounts = set()
     accounts.add(wallet_address)
-    instrs = instructions[:] + inner[:]
 
     # Add associated accounts from Instructions
-    for instruction in instrs:
+    for instruction in itertools.chain(instructions, inner):
         if "parsed" in instruction:
             parsed = instruction["parsed"]
             if type(parsed) is dict:
@@ -1,6 +1,8 @@
 import logging
+import time
 
 from common.ErrorCounter import ErrorCounter
+from common.HandlerStats import HandlerStats
 from sol import constants as co
 from sol.config_sol import localconfig
 from sol.handle_account_misc import (
@@ -28,94 +30,86 @@ from sol.handle_wormhole import handle_wormhole
 from sol.parser import parse_tx
 
 
+# Handlers in priority order: (<program id> or <match function>, handler).  First match wins.
+HANDLERS = [
+    (is_notimestamp_tx, handle_notimestamp_tx),
+
+    # Bridges
+    (co.PROGRAMID_WORMHOLE, handle_wormhole),
+    (co.PROGRAMID_WORMHOLE2, handle_wormhole),
+
+    # Serum programs
+    (co.PROGRAMID_SWAP_V2, handle_program_swap_v2),
+    (co.PROGRAMID_SERUM_V3, handle_serumv3),
+
+    # Marinade Finance
+    (co.PROGRAMID_MARINADE, handle_marinade),
+
+    # Unknown programs
+    (co.PROGRAMID_UNKNOWN_DJV, handle_djv),
+    (co.PROGRAMID_UNKNOWN_2KD, handle_2kd),
+
+    # Raydium programs
+    (co.PROGRAMID_RAYDIUM_LP_V2, handle_raydium_lp_v2),
+    (co.PROGRAMID_RAYDIUM_LP_V3, handle_raydium_lp_v3),
+    (co.PROGRAMID_RAYDIUM_LP_V4, handle_raydium_lp_v4),
+    (co.PROGRAMID_RAYDIUM_STAKE, handle_raydium_stake),
+    (co.PROGRAMID_RAYDIUM_STAKE_V4, handle_raydium_stake_v4),
+    (co.PROGRAMID_RAYDIUM_STAKE_V5, handle_raydium_stake_v5),
+
+    # Orca programs
+    (co.PROGRAMID_ORCA_SWAP_V2, handle_orca_swap_v2),
+
+    # Saber programs
+    (co.PROGRAMID_SABER, handle_saber),
+    (co.PROGRAMID_SABER_STABLE_SWAP, handle_saber_stable_swap),
+    (co.PROGRAMID_SABER_FARM_SSF, handle_saber_farm_ssf),
+
+    # Jupiter Aggregator
+    (co.PROGRAMID_JUPITER_AGGREGATOR_V2, handle_jupiter_aggregator_v2),
+
+    # Metaplex NFT Candy Machinine program
+    (co.PROGRAMID_METAPLEX_CANDY, handle_metaplex),
+
+    # NFT marketplace transactions
+    (get_nft_program, handle_nft_exchange),
+
+    # NFT transactions
+    (is_nft_mint, handle_nft_mint),
+
+    # Other
+    (co.PROGRAMID_VOTE, handle_vote),
+    (is_simple_tx, handle_simple_tx),
+    (is_init_account_tx, handle_init_account_tx),
+    (is_transfer, handle_transfer),
+    (is_close_account_tx, handle_close_account_tx),
+]
+
+# program id -> (priority, handler)
+PROGRAM_HANDLERS = {}
+# list of (priority, match function, handler), in priority order
+MATCH_HANDLERS = []
+for priority, (key, handler) in enumerate(HANDLERS):
+    if isinstance(key, str):
+        PROGRAM_HANDLERS.setdefault(key, (priority, handler))
+    else:
+        MATCH_HANDLERS.append((priority, key, handler))
+
+
 def process_tx(wallet_info, exporter, txid, data):
     txinfo = parse_tx(txid, data, wallet_info)
 
     try:
         if not txinfo:
             return
-        program_ids = txinfo.program_ids
-
-        if is_notimestamp_tx(txinfo):
-            handle_notimestamp_tx(exporter, txinfo)
-
-        # Bridges
-        elif co.PROGRAMID_WORMHOLE in program_ids or co.PROGRAMID_WORMHOLE2 in program_ids:
-            handle_wormhole(exporter, txinfo)
-
-        # Serum programs
-        elif co.PROGRAMID_SWAP_V2 in program_ids:
-            handle_program_swap_v2(exporter, txinfo)
-        elif co.PROGRAMID_SERUM_V3 in program_ids:
-            handle_serumv3(exporter, txinfo)
-
-        # Marinade Finance
-        elif co.PROGRAMID_MARINADE in program_ids:
-            handle_marinade(exporter, txinfo)
-
-        # Unknown programs
-        elif co.PROGRAMID_UNKNOWN_DJV in program_ids:
-            handle_djv(exporter, txinfo)
-        elif co.PROGRAMID_UNKNOWN_2KD in program_ids:
-            handle_2kd(exporter, txinfo)
-
-        # Raydium programs
-        elif co.PROGRAMID_RAYDIUM_LP_V2 in program_ids:
-            handle_raydium_lp_v2(exporter, txinfo)
-        elif co.PROGRAMID_RAYDIUM_LP_V3 in program_ids:
-            handle_raydium_lp_v3(exporter, txinfo)
-        elif co.PROGRAMID_RAYDIUM_LP_V4 in program_ids:
-            handle_raydium_lp_v4(exporter, txinfo)
-        elif co.PROGRAMID_RAYDIUM_STAKE in program_ids:
-            handle_raydium_stake(exporter, txinfo)
-        elif co.PROGRAMID_RAYDIUM_STAKE_V4 in program_ids:
-            handle_raydium_stake_v4(exporter, txinfo)
-        elif co.PROGRAMID_RAYDIUM_STAKE_V5 in program_ids:
-            handle_raydium_stake_v5(exporter, txinfo)
-
-        # Orca programs
-        elif co.PROGRAMID_ORCA_SWAP_V2 in program_ids:
-            handle_orca_swap_v2(exporter, txinfo)
-
-        # Saber programs
-        elif co.PROGRAMID_SABER in program_ids:
-            handle_saber(exporter, txinfo)
-        elif co.PROGRAMID_SABER_STABLE_SWAP in program_ids:
-            handle_saber_stable_swap(exporter, txinfo)
-        elif co.PROGRAMID_SABER_FARM_SSF in program_ids:
-            handle_saber_farm_ssf(exporter, txinfo)
-
-        # Jupiter Aggregator
-        elif co.PROGRAMID_JUPITER_AGGREGATOR_V2 in program_ids:
-            handle_jupiter_aggregator_v2(exporter, txinfo)
-
-        # Metaplex NFT Candy Machinine program
-        elif co.PROGRAMID_METAPLEX_CANDY in program_ids:
-            handle_metaplex(exporter, txinfo)
-
-        # NFT marketplace transactions
-        elif get_nft_program(txinfo):
-            handle_nft_exchange(exporter, txinfo)
-
-        # NFT transactions
-        elif is_nft_mint(txinfo):
-            handle_nft_mint(exporter, txinfo)
-
-        # Other
-        elif co.PROGRAMID_VOTE in program_ids:
-            handle_vote(exporter, txinfo)
-        elif is_simple_tx(txinfo):
-            handle_simple_tx(exporter, txinfo)
-        elif is_init_account_tx(txinfo):
-            handle_init_account_tx(exporter, txinfo)
-        elif is_transfer(txinfo):
-            handle_transfer(exporter, txinfo)
-        elif is_close_account_tx(txinfo):
-            handle_close_account_tx(exporter, txinfo)
-
-        else:
-            handle_unknown_detect_transfers(exporter, txinfo)
-            ErrorCounter.increment("unknown_sol_tx", txid)
+
+        handler = _resolve_handler(txinfo)
+
+        time_start = time.time()
+        try:
+            handler(exporter, txinfo)
+        finally:
+            HandlerStats.record(handler.__name__, time.time() - time_start)
 
     except Exception as e:
         logging.error("Exception when handling txid=%s, exception=%s", txid, str(e))
@@ -126,3 +120,27 @@ def process_tx(wallet_info, exporter, txid, data):
             raise e
 
     return txinfo
+
+
+def _resolve_handler(txinfo):
+    """ Returns handler for transaction, i.e. the highest priority match in HANDLERS """
+    # Highest priority handler among programs in transaction (one set intersection)
+    matched = PROGRAM_HANDLERS.keys() & set(txinfo.program_ids or [])
+    program_priority, program_handler = min(
+        (PROGRAM_HANDLERS[program_id] for program_id in matched), default=(len(HANDLERS), None))
+
+    # Match functions only need to be evaluated if higher priority than program match
+    for priority, is_match, handler in MATCH_HANDLERS:
+        if priority > program_priority:
+            break
+        if is_match(txinfo):
+            return handler
+
+    if program_handler:
+        return program_handler
+    return handle_unknown_program
+
+
+def handle_unknown_program(exporter, txinfo):
+    handle_unknown_detect_transfers(exporter, txinfo)
+    ErrorCounter.increment("unknown_sol_tx", txinfo.txid)
@@ -1,11 +1,14 @@
 import csv
+import datetime
 import glob
 import logging
 import os
-import subprocess
-import datetime
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from sol.api_rpc import RpcAPI
+from sol.block_times import BlockTimeDB
 from sol.config_sol import localconfig
 from sol.make_tx import make_sol_reward_tx
 
@@ -13,21 +16,46 @@ DATADIR = os.path.dirname(os.path.realpath(__file__)) + "/data_staking_rewards"
 START_EPOCH = 132  # epoch of first ever staking reward
 
 
-def reward_txs(wallet_info, exporter, progress, min_date):
+def reward_txs(wallet_info, exporter, progress, min_date, max_date=None):
     """Get reward transactions across all staking addresses for this wallet"""
-    staking_addresses = wallet_info.get_staking_addresses()
+    staking_addresses = sorted(wallet_info.get_staking_addresses())
     wallet_address = wallet_info.wallet_address
+    if not staking_addresses:
+        return
+
+    epochs = _reward_txs_epochs(min_date)
+
+    # Rewards already indexed locally (single lookup per staking address across all epochs)
+    stored_epochs = EpochDB.epochs()
+    stored_rewards = {addr: EpochDB.rewards(addr) for addr in staking_addresses}
+
+    # Fetch rewards for remaining epochs: all staking addresses in one query per epoch, epochs concurrently
+    progress.report_message("Fetching staking rewards...")
+    missing_epochs = [epoch for epoch in epochs if epoch not in stored_epochs]
+    with ThreadPoolExecutor(max_workers=localconfig.fetch_workers) as executor:
+        results = executor.map(lambda epoch: _fetch_rewards(epoch, staking_addresses), missing_epochs)
+        fetched_rewards = dict(zip(missing_epochs, results))
+
+    # Fetch timestamps of all reward slots in bulk
+    slots = set()
+    for addr in staking_addresses:
+        slots.update(stored_epochs[epoch] for epoch in stored_rewards[addr] if epoch in epochs)
+    for rewards in fetched_rewards.values():
+        slots.update(slot for addr, (amount, slot) in rewards.items() if amount and slot)
+    _prefill_block_datetimes(slots)
 
     for i, addr in enumerate(staking_addresses):
         progress.report(i, f"Fetching rewards for {addr}...", "staking")
-        _reward_txs(wallet_address, exporter, addr, min_date)
+        _reward_txs(wallet_address, exporter, addr, min_date, max_date, epochs,
+                    stored_epochs, stored_rewards[addr], fetched_rewards)
 
 
-def _reward_txs(wallet_address, exporter, staking_address, min_date):
+def _reward_txs(wallet_address, exporter, staking_address, min_date, max_date, epochs,
+                stored_epochs, stored_rewards, fetched_rewards):
     """Get reward transactions for this staking address"""
     rewards = []
-    for epoch in _reward_txs_epochs(min_date):
-        timestamp, reward = _get_reward(epoch, staking_address)
+    for epoch in epochs:
+        timestamp, reward = _get_reward(epoch, staking_address, stored_epochs, stored_rewards, fetched_rewards)
         if not reward:
             continue
 
@@ -35,6 +63,9 @@ def _reward_txs(wallet_address, exporter, staking_address, min_date):
         date, _ = timestamp.split(" ")
         if min_date and _date(date) < _date(min_date):
             continue
+        # Filter out rewards after max_date
+        if max_date and _date(date) > _date(max_date):
+            continue
 
         rewards.append([epoch, timestamp, reward])
 
@@ -52,7 +83,7 @@ def _reward_txs_epochs(min_date):
 
     if min_date:
         # look for epoch guaranteed before/equal this date
-        result = EpochFile.newest_epoch_before_date(min_date)
+        result = EpochDB.newest_epoch_before_date(min_date)
         start_epoch = result if result else START_EPOCH
     else:
         start_epoch = START_EPOCH
@@ -60,119 +91,156 @@ def _reward_txs_epochs(min_date):
     return range(start_epoch, end_epoch)
 
 
-def _get_reward(epoch, staking_address):
-    """ Returns single reward (timestamp_of_reward, float_reward_amount) for staking_address at this epoch. """
+def _fetch_rewards(epoch, staking_addresses):
+    """ Returns dict of staking_address -> (amount, slot) for this epoch, fetched from rpc. """
     flush = localconfig.job is None
 
-    epoch_file_path = EpochFile.path(epoch)
-    if epoch_file_path:
-        # Found epoch rewards file.  Find user's reward in this epoch.
+    logging.info("Fetching inflation rewards for %s staking addresses, epoch=%s ...", len(staking_addresses), epoch)
+    rewards = RpcAPI.get_inflation_rewards(staking_addresses, epoch)
 
-        slot = EpochFile.slot(epoch_file_path)
-        amount = EpochFile.read_rewards(staking_address, epoch_file_path)
-        if amount is None:
-            return None, None
-    else:
-        logging.info("Fetching inflation reward for staking_address=%s, epoch=%s ...", staking_address, epoch)
-        amount, slot = RpcAPI.get_inflation_reward(staking_address, epoch)
+    slots = [slot for _, slot in rewards.values() if slot]
+    if flush and slots:
+        logging.info("Retrieving rewards for all users in epoch=%s...", epoch)
+        block_rewards = RpcAPI.get_block_rewards(slots[0])
+        if not block_rewards:
+            return {}
+        EpochDB.write_rewards(epoch, slots[0], block_rewards)
+
+    return rewards
 
-        if flush and slot:
-            logging.info("Retrieving rewards for all users in epoch=%s...", epoch)
-            block_rewards = RpcAPI.get_block_rewards(slot)
-            if not block_rewards:
-                return None, None
-            EpochFile.write_rewards(epoch, slot, block_rewards)
+
+def _get_reward(epoch, staking_address, stored_epochs, stored_rewards, fetched_rewards):
+    """ Returns single reward (timestamp_of_reward, float_reward_amount) for staking_address at this epoch. """
+    if epoch in stored_epochs:
+        # Found epoch rewards in local index.  Find user's reward in this epoch.
+        slot = stored_epochs[epoch]
+        amount = stored_rewards.get(epoch)
+    else:
+        amount, slot = fetched_rewards.get(epoch, {}).get(staking_address, (None, None))
 
     # Get timestamp of the reward
     if not amount or not slot:
         return None, None
     timestamp = _block_datetime(slot)
+    if not timestamp:
+        return None, None
 
     return timestamp, amount
 
 
-def _cmd2(s):
-    return subprocess.getoutput(s)
-
-
 def _block_datetime(block):
     block = str(block)
 
     if block in localconfig.blocks:
         return localconfig.blocks[block]
 
-    logging.info("Fetching block time for block=%s", block)
-    timestamp = RpcAPI.get_block_time(block)
+    ts = BlockTimeDB.get(block)
+    if ts is None:
+        logging.info("Fetching block time for block=%s", block)
+        ts = BlockTimeDB.prefill([block]).get(int(block))
+        if ts is None:
+            return None
+
+    timestamp = _datetime_string(ts)
     localconfig.blocks[block] = timestamp
     return timestamp
 
 
+def _prefill_block_datetimes(blocks):
+    """ Fetches block times for all blocks not yet cached, in bulk """
+    blocks = [str(block) for block in blocks if str(block) not in localconfig.blocks]
+    for block, ts in BlockTimeDB.prefill(blocks).items():
+        localconfig.blocks[str(block)] = _datetime_string(ts)
+
+
+def _datetime_string(ts):
+    return datetime.datetime.utcfromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
 def _date(date_string):
     y, m, d = date_string.split("-")
     return datetime.date(int(y), int(m), int(d))
 
 
-class EpochFile:
-    # epoch.<epoch>.<date>.<slot>.csv
+class EpochDB:
+    """ Local sqlite index of staking rewards for all users, for each epoch already fetched.
 
-    @classmethod
-    def _epoch_path(cls, epoch, date, slot):
-        return "{}/epoch.{}.{}.{}.csv".format(DATADIR, epoch, date, slot)
+    Rewards are keyed by (staking_address, epoch), so all rewards of a staking address are a single lookup.
+    Legacy epoch files (epoch.<epoch>.<date>.<slot>.csv) found in DATADIR are imported on first use.
+    """
+    path = DATADIR + "/rewards.db"
+    conn = None
+    lock = threading.Lock()
 
     @classmethod
-    def path(cls, epoch):
-        """ Returns path of epoch file if exists, else None """
-        glob_expr = "{}/epoch.{}.*.csv".format(DATADIR, epoch)
-        result = glob.glob(glob_expr)
-        if result and len(result) == 1:
-            mypath = result[0]
-            return mypath
-        else:
-            return None
+    def _conn(cls):
+        if cls.conn is None:
+            cls.conn = sqlite3.connect(cls.path, check_same_thread=False)
+            cls.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS epochs (epoch INTEGER PRIMARY KEY, date TEXT, slot INTEGER);
+                CREATE TABLE IF NOT EXISTS rewards (
+                    staking_address TEXT, epoch INTEGER, amount REAL, PRIMARY KEY (staking_address, epoch)
+                ) WITHOUT ROWID;
+            """)
+            cls._import_epoch_files()
+        return cls.conn
 
     @classmethod
-    def newest_epoch_before_date(cls, min_date):
-        newest_epoch = 0
+    def _import_epoch_files(cls):
+        imported = set(epoch for epoch, in cls.conn.execute("SELECT epoch FROM epochs"))
 
-        # Get all epoch filenames
-        glob_expr = "{}/epoch.*.csv".format(DATADIR)
-        result = glob.glob(glob_expr)
-        filenames = [os.path.basename(path) for path in result]
+        for path in glob.glob("{}/epoch.*.csv".format(DATADIR)):
+            _, epoch, date, slot, _ = os.path.basename(path).split(".")
+            if int(epoch) in imported:
+                continue
 
-        # Find newest epoch with date <= min_date
-        for filename in filenames:
-            _, epoch, date, slot, _ = filename.split(".")
-            epoch = int(epoch)
+            with open(path, "r") as f:
+                block_rewards = [(addr, float(amount)) for addr, amount in csv.reader(f)]
+            cls._insert(int(epoch), date, int(slot), block_rewards)
+            logging.info("Imported %s into %s", path, cls.path)
 
-            if _date(date) <= _date(min_date) and epoch >= newest_epoch:
-                newest_epoch = epoch
+    @classmethod
+    def _insert(cls, epoch, date, slot, block_rewards):
+        with cls.conn:
+            cls.conn.executemany(
+                "INSERT OR REPLACE INTO rewards VALUES (?, ?, ?)",
+                ((addr, epoch, amount) for addr, amount in block_rewards)
+            )
+            cls.conn.execute("INSERT OR REPLACE INTO epochs VALUES (?, ?, ?)", (epoch, date, slot))
 
-        return newest_epoch
+    @classmethod
+    def epochs(cls):
+        """ Returns dict of epoch -> slot for all epochs in index """
+        with cls.lock:
+            rows = cls._conn().execute("SELECT epoch, slot FROM epochs").fetchall()
+        return dict(rows)
 
     @classmethod
-    def slot(cls, path):
-        filename = os.path.basename(path)
-        _, epoch, date, slot, _ = filename.split(".")
-        return slot
+    def rewards(cls, staking_address):
+        """ Returns dict of epoch -> reward amount for staking_address, across all epochs in index """
+        with cls.lock:
+            rows = cls._conn().execute(
+                "SELECT epoch, amount FROM rewards WHERE staking_address = ?", (staking_address,)).fetchall()
+        return dict(rows)
 
     @classmethod
-    def read_rewards(cls, staking_address, path):
-        result = _cmd2(f"grep {staking_address} {path}")
-        if not result:
-            return None
-        _, amount = result.split(",")
-        return amount
+    def newest_epoch_before_date(cls, min_date):
+        """ Returns newest epoch with date <= min_date (0 if none) """
+        with cls.lock:
+            row = cls._conn().execute(
+                "SELECT MAX(epoch) FROM epochs WHERE date <= ?", (_date(min_date).isoformat(),)).fetchone()
+        return row[0] if row[0] is not None else 0
 
     @classmethod
     def write_rewards(cls, epoch, slot, block_rewards):
-        """ Writes rewards for all users in this epoch to a csv file """
-        # Determine path for epoch file
-        dt = _block_datetime(slot)
-        date = dt.split(" ")[0]
-        path = cls._epoch_path(epoch, date, slot)
-
-        with open(path, "w") as f:
-            mywriter = csv.writer(f)
-
-            mywriter.writerows(block_rewards)
-        logging.info("Wrote to %s", path)
+        """ Writes rewards for all users in this epoch to index """
+        # Exact block time required: date is persisted and used to find starting epoch for min_date
+        timestamp = _block_datetime(slot)
+        if timestamp is None:
+            raise Exception("Unable to fetch block time for epoch={} slot={}".format(epoch, slot))
+        date = timestamp.split(" ")[0]
+
+        with cls.lock:
+            cls._conn()
+            cls._insert(epoch, date, int(slot), block_rewards)
+        logging.info("Wrote rewards for epoch=%s to %s", epoch, cls.path)
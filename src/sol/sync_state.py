@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+
+from common.Exporter import Row
+from settings_csv import REPORTS_DIR, TICKER_SOL
+
+
+class SyncState:
+    """ Results of previous report run for a wallet, persisted for incremental sync (--incremental option).
+
+    high_water_marks: dict of <address> -> <newest finalized txid> (wallet address and each token account)
+    txids: set of txids already processed
+    rows: exporter rows of already processed transactions (excludes staking rewards, which are recomputed)
+    staking_addresses: staking addresses found in already processed transactions
+    """
+
+    def __init__(self, wallet_address, start_date, end_date):
+        self.wallet_address = wallet_address
+        self.start_date = start_date
+        self.end_date = end_date
+        self.high_water_marks = {}
+        self.txids = set()
+        self.rows = []
+        self.staking_addresses = set()
+
+    @classmethod
+    def _path(cls, wallet_address):
+        return f"{REPORTS_DIR}/sync.{TICKER_SOL}.{wallet_address}.json"
+
+    @classmethod
+    def load(cls, wallet_address, start_date, end_date):
+        """ Returns state of previous run, or empty state if none (or previous run used different date range) """
+        state = cls(wallet_address, start_date, end_date)
+        path = cls._path(wallet_address)
+        if not os.path.exists(path):
+            return state
+
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data["start_date"] != start_date or data.get("end_date") != end_date:
+            logging.info("Ignoring %s (start_date/end_date changed)", path)
+            return state
+
+        state.high_water_marks = data["high_water_marks"]
+        state.txids = set(data["txids"])
+        state.rows = [cls._row(row_dict) for row_dict in data["rows"]]
+        state.staking_addresses = set(data["staking_addresses"])
+        logging.info("Loaded %s (%s txids)", path, len(state.txids))
+        return state
+
+    def save(self):
+        if not os.path.exists(REPORTS_DIR):
+            os.mkdir(REPORTS_DIR)
+        path = self._path(self.wallet_address)
+        data = {
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "high_water_marks": self.high_water_marks,
+            "txids": sorted(self.txids),
+            "rows": [row.__dict__ for row in self.rows],
+            "staking_addresses": sorted(self.staking_addresses),
+        }
+
+        # Write to temp file first so that an interrupted run never leaves a partial file
+        path_tmp = f"{path}.tmp"
+        with open(path_tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(path_tmp, path)
+        logging.info("Wrote %s", path)
+
+    @classmethod
+    def _row(cls, row_dict):
+        # Restore attributes as saved (bypass Row.__init__, which would reformat amounts)
+        row = Row.__new__(Row)
+        row.__dict__.update(row_dict)
+        return row
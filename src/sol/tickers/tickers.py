@@ -1,39 +1,118 @@
+"""
+usage: python3 -m sol.tickers.tickers
+
+Compiles solana.tokenlist.json into solana.tokenlist.idx, a sorted fixed-width mint -> symbol table that Tickers
+reads via mmap/binary search (built automatically on first lookup if missing or older than json file).
+"""
+
 import json
 import logging
+import mmap
 import os
+import struct
 
 # From https://github.com/solana-labs/token-list/blob/main/src/tokens/solana.tokenlist.json
 # https://raw.githubusercontent.com/solana-labs/token-list/main/src/tokens/solana.tokenlist.json
 PATH_JSON = os.path.dirname(os.path.realpath(__file__)) + "/solana.tokenlist.json"
+PATH_INDEX = os.path.dirname(os.path.realpath(__file__)) + "/solana.tokenlist.idx"
+
+# Index layout: header, followed by <count> records of (address, symbol), sorted by address.
+# Fields are utf-8 encoded and right padded with null bytes to fixed widths.
+INDEX_MAGIC = b"SOLTKIX1"
+INDEX_HEADER = struct.Struct("<8sIHH")  # magic, count, address width, symbol width
+ADDRESS_WIDTH = 44  # max length of base58 encoded 32 byte address
 
 
 class Tickers:
-    loaded = False
-    tickers = {}
+    index = None
+    count = 0
+    symbol_width = 0
+    record_size = 0
 
     @classmethod
     def _load(cls):
-        if cls.loaded is False:
-            logging.info("Loading {}".format(PATH_JSON))
-            with open(PATH_JSON) as f:
-                data = json.load(f)
-                for info in data["tokens"]:
-                    address = info["address"]
-                    symbol = info["symbol"]
+        if cls.index is None:
+            if _is_index_stale():
+                build_index()
+
+            with open(PATH_INDEX, "rb") as f:
+                cls.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-                    # extra stuff I can probably use later
-                    # name = info["name"]
-                    # logouri = info.get("logoURI")
+            magic, cls.count, _, cls.symbol_width = INDEX_HEADER.unpack_from(cls.index, 0)
+            if magic != INDEX_MAGIC:
+                raise Exception("Bad tickers index file {}".format(PATH_INDEX))
+            cls.record_size = ADDRESS_WIDTH + cls.symbol_width
 
-                    cls.tickers[address] = symbol
-            cls.loaded = True
+    @classmethod
+    def _lookup(cls, address):
+        key = address.encode().ljust(ADDRESS_WIDTH, b"\0")
+        if len(key) > ADDRESS_WIDTH:
+            return None
+
+        # Binary search over sorted records
+        lo, hi = 0, cls.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = INDEX_HEADER.size + mid * cls.record_size
+            cur = cls.index[start:start + ADDRESS_WIDTH]
+            if cur < key:
+                lo = mid + 1
+            elif cur > key:
+                hi = mid
+            else:
+                symbol = cls.index[start + ADDRESS_WIDTH:start + cls.record_size]
+                return symbol.rstrip(b"\0").decode()
+        return None
 
     @classmethod
     def get(cls, address):
         cls._load()
 
-        ticker = cls.tickers.get(address, None)
+        ticker = cls._lookup(address)
         if ticker:
             return ticker
         else:
             return address
+
+
+def _is_index_stale():
+    if not os.path.exists(PATH_INDEX):
+        return True
+    return os.path.getmtime(PATH_INDEX) < os.path.getmtime(PATH_JSON)
+
+
+def build_index():
+    """ Compiles token list json file into index file """
+    logging.info("Compiling {} into {}".format(PATH_JSON, PATH_INDEX))
+    with open(PATH_JSON) as f:
+        data = json.load(f)
+
+    tickers = {}
+    for info in data["tokens"]:
+        address = info["address"].encode()
+        symbol = info["symbol"].encode()
+
+        # extra stuff I can probably use later
+        # name = info["name"]
+        # logouri = info.get("logoURI")
+
+        if len(address) <= ADDRESS_WIDTH:
+            tickers[address] = symbol
+
+    symbol_width = max((len(symbol) for symbol in tickers.values()), default=0)
+    records = [
+        address.ljust(ADDRESS_WIDTH, b"\0") + symbol.ljust(symbol_width, b"\0")
+        for address, symbol in sorted(tickers.items(), key=lambda x: x[0].ljust(ADDRESS_WIDTH, b"\0"))
+    ]
+
+    # Write to temp file first so that concurrent processes never read a partial index
+    path_tmp = "{}.{}.tmp".format(PATH_INDEX, os.getpid())
+    with open(path_tmp, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(records), ADDRESS_WIDTH, symbol_width))
+        f.write(b"".join(records))
+    os.replace(path_tmp, PATH_INDEX)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_index()
@@ -0,0 +1,69 @@
+"""
+Local store of finalized Solana transactions (data returned by RpcAPI.fetch_tx()), keyed by txid (signature).
+
+Finalized transactions never change, so stored data is reused across runs, wallets and processes.  Data is stored
+zlib-compressed in a sqlite table indexed by txid.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+DATADIR = os.path.dirname(os.path.realpath(__file__)) + "/data_txs"
+MAX_VARIABLES_PER_QUERY = 500
+
+
+class TxStore:
+
+    path = DATADIR + "/txs.db"
+    conn = None
+    lock = threading.Lock()
+
+    @classmethod
+    def _conn(cls):
+        if cls.conn is None:
+            # WAL mode allows concurrent readers while another process writes
+            cls.conn = sqlite3.connect(cls.path, check_same_thread=False, timeout=30)
+            cls.conn.execute("PRAGMA journal_mode=WAL")
+            cls.conn.execute("CREATE TABLE IF NOT EXISTS txs (txid TEXT PRIMARY KEY, data BLOB) WITHOUT ROWID")
+        return cls.conn
+
+    @classmethod
+    def get(cls, txid):
+        """ Returns stored transaction data for txid, or None """
+        return cls.get_many([txid]).get(txid)
+
+    @classmethod
+    def get_many(cls, txids):
+        """ Returns dict of txid -> transaction data for txids found in store """
+        txids = list(set(txids))
+        rows = []
+        with cls.lock:
+            conn = cls._conn()
+            for i in range(0, len(txids), MAX_VARIABLES_PER_QUERY):
+                chunk = txids[i:i + MAX_VARIABLES_PER_QUERY]
+                query = "SELECT txid, data FROM txs WHERE txid IN ({})".format(",".join("?" * len(chunk)))
+                rows.extend(conn.execute(query, chunk).fetchall())
+
+        return {txid: json.loads(zlib.decompress(data)) for txid, data in rows}
+
+    @classmethod
+    def put_many(cls, txs):
+        """ Stores dict of txid -> transaction data (skips data without result, i.e. errors) """
+        values = [
+            (txid, zlib.compress(json.dumps(data, separators=(",", ":")).encode()))
+            for txid, data in txs.items() if cls._is_storable(data)
+        ]
+        if not values:
+            return
+
+        with cls.lock:
+            conn = cls._conn()
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO txs VALUES (?, ?)", values)
+
+    @classmethod
+    def _is_storable(cls, data):
+        return isinstance(data, dict) and data.get("result") is not None
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules are imported relative to src/ (as when running python3 report_*.py from src/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "src"))
@@ -0,0 +1,99 @@
+import threading
+
+from common.ibc.api_common import EVENTS_TYPE_RECIPIENT, EVENTS_TYPE_SENDER
+from common.ibc.api_lcd import LcdTxsSession
+
+LIMIT = 10
+
+
+class FakeProgress:
+
+    def report(self, num, message, stage_name="default"):
+        pass
+
+
+class FakeLcdAPI:
+    """ Serves LcdAPI.get_txs() pages from a list of txs per events type, reporting total count `totals` """
+
+    def __init__(self, txs, totals):
+        self.txs = txs
+        self.totals = totals
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def get_txs(self, wallet_address, events_type, offset=0, limit=LIMIT, sleep_seconds=1):
+        with self.lock:
+            self.queries.append((events_type, offset))
+        elems = self.txs[events_type][offset:offset + limit]
+        next_offset = offset + limit if len(elems) == limit else None
+        return elems, next_offset, self.totals[events_type]
+
+
+def _txs(prefix, count):
+    return [{"txhash": f"{prefix}{i}", "timestamp": f"2022-01-01T00:00:{59 - i:02d}Z"} for i in range(count)]
+
+
+def _session(txs, totals, max_txs=1000):
+    session = LcdTxsSession("http://node", "wallet", max_txs, limit=LIMIT,
+                            events_types=[EVENTS_TYPE_SENDER, EVENTS_TYPE_RECIPIENT])
+    session.api = FakeLcdAPI(txs, totals)
+    return session
+
+
+def test_get_txs_all_uses_total_count():
+    txs = {EVENTS_TYPE_SENDER: _txs("s", 35), EVENTS_TYPE_RECIPIENT: _txs("r", 20)}
+    session = _session(txs, {EVENTS_TYPE_SENDER: 35, EVENTS_TYPE_RECIPIENT: 20})
+
+    out = session.get_txs_all(FakeProgress(), sleep_seconds=0)
+
+    assert [elem["txhash"] for elem in out] == [elem["txhash"] for elem in
+                                                 sorted(txs[EVENTS_TYPE_SENDER] + txs[EVENTS_TYPE_RECIPIENT],
+                                                        key=lambda elem: elem["timestamp"], reverse=True)]
+    # Full last page (recipient offset 10) requires one more (empty) page to detect end
+    assert len(session.api.queries) == 4 + 3
+
+
+def test_get_txs_all_first_page_reused_by_pages_count():
+    txs = {EVENTS_TYPE_SENDER: _txs("s", 25), EVENTS_TYPE_RECIPIENT: []}
+    session = _session(txs, {EVENTS_TYPE_SENDER: 25, EVENTS_TYPE_RECIPIENT: 0})
+
+    assert session.pages_count() == 3 + 1
+    out = session.get_txs_all(FakeProgress(), sleep_seconds=0)
+
+    assert len(out) == 25
+    assert session.api.queries.count((EVENTS_TYPE_SENDER, 0)) == 1
+    assert session.api.queries.count((EVENTS_TYPE_RECIPIENT, 0)) == 1
+
+
+def test_get_txs_all_total_count_zero():
+    txs = {EVENTS_TYPE_SENDER: _txs("s", 30), EVENTS_TYPE_RECIPIENT: _txs("r", 5)}
+    session = _session(txs, {EVENTS_TYPE_SENDER: 0, EVENTS_TYPE_RECIPIENT: 0})
+
+    out = session.get_txs_all(FakeProgress(), sleep_seconds=0)
+
+    assert len(out) == 35
+    # Full last page (offset 20) requires one more (empty) page to detect end
+    assert sorted(session.api.queries) == sorted([
+        (EVENTS_TYPE_SENDER, 0), (EVENTS_TYPE_SENDER, 10), (EVENTS_TYPE_SENDER, 20), (EVENTS_TYPE_SENDER, 30),
+        (EVENTS_TYPE_RECIPIENT, 0)])
+
+
+def test_get_txs_all_total_count_stale():
+    txs = {EVENTS_TYPE_SENDER: _txs("s", 45), EVENTS_TYPE_RECIPIENT: _txs("r", 3)}
+    session = _session(txs, {EVENTS_TYPE_SENDER: 20, EVENTS_TYPE_RECIPIENT: 3})
+
+    out = session.get_txs_all(FakeProgress(), sleep_seconds=0)
+
+    assert set(elem["txhash"] for elem in out) == set(
+        elem["txhash"] for elem in txs[EVENTS_TYPE_SENDER] + txs[EVENTS_TYPE_RECIPIENT])
+
+
+def test_get_txs_all_max_txs():
+    txs = {EVENTS_TYPE_SENDER: _txs("s", 50), EVENTS_TYPE_RECIPIENT: []}
+    for total in (50, 0):
+        session = _session(txs, {EVENTS_TYPE_SENDER: total, EVENTS_TYPE_RECIPIENT: 0}, max_txs=20)
+
+        out = session.get_txs_all(FakeProgress(), sleep_seconds=0)
+
+        assert len(out) == 20
+        assert (EVENTS_TYPE_SENDER, 20) not in session.api.queries
@@ -0,0 +1,170 @@
+import pytest
+from common.ibc.protobuf_decoder import (
+    CosmosTransactionFeeExtractor,
+    ProtobufParser,
+    ProtobufParserCallback,
+    ProtobufParserMessageAction,
+    ProtobufWireType,
+    read_varint,
+)
+
+
+def _varint(value):
+    out = b""
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out += bytes([byte | 0x80])
+        else:
+            return out + bytes([byte])
+
+
+def _field_varint(field_number, value):
+    return _varint(field_number << 3) + _varint(value)
+
+
+def _field_bytes(field_number, data):
+    return _varint(field_number << 3 | 2) + _varint(len(data)) + data
+
+
+def _cosmos_tx(fee_denom, fee_amount, memo=b""):
+    """ Returns protobuf encoded cosmos.tx.v1beta1.TxRaw-like Tx (body, auth_info, signatures) """
+    amount = _field_bytes(1, b"uatom") + _field_bytes(2, b"1000")
+    msg_send = _field_bytes(1, b"cosmos1from") + _field_bytes(2, b"cosmos1to") + _field_bytes(3, amount)
+    any_msg = _field_bytes(1, b"/cosmos.bank.v1beta1.MsgSend") + _field_bytes(2, msg_send)
+    body = _field_bytes(1, any_msg) + _field_bytes(2, memo) + _field_varint(3, 123456)
+
+    signer_info = _field_bytes(1, _field_bytes(1, b"/cosmos.crypto.secp256k1.PubKey")) + _field_varint(3, 7)
+    coin = _field_bytes(1, fee_denom) + _field_bytes(2, fee_amount)
+    fee = _field_bytes(1, coin) + _field_varint(2, 200000)
+    auth_info = _field_bytes(1, signer_info) + _field_bytes(2, fee)
+
+    return _field_bytes(1, body) + _field_bytes(2, auth_info) + _field_bytes(3, bytes(64))
+
+
+class Recorder(ProtobufParserCallback):
+    """ Records every callback.  Length delimited fields at message_paths are parsed as messages, others as bytes """
+
+    def __init__(self, message_paths):
+        self.message_paths = message_paths
+        self.events = []
+
+    def on_length_delimited_field(self, field_number, field_path):
+        if field_path in self.message_paths:
+            self.events.append(("message", field_path))
+            return ProtobufParserMessageAction.PARSE_AS_MESSAGE
+        return ProtobufParserMessageAction.PARSE_AS_BYTES
+
+    def on_field(self, wire_type, field_number, field_value, field_path):
+        self.events.append((wire_type, field_path, field_value))
+
+
+def test_read_varint():
+    assert read_varint(memoryview(b"\x01"), 0) == (1, 1)
+    assert read_varint(memoryview(b"\xac\x02"), 0) == (300, 2)
+    assert read_varint(memoryview(b"\x00\xff\xff\xff\xff\x0f"), 1) == (2 ** 32 - 1, 6)
+
+    with pytest.raises(EOFError):
+        read_varint(memoryview(b"\xac"), 0)
+
+
+def test_fee_extractor():
+    callback = CosmosTransactionFeeExtractor()
+    ProtobufParser(_cosmos_tx(b"uatom", b"5000"), callback).parse()
+
+    assert (callback.fee_denom, callback.fee_amount) == ("uatom", "5000")
+
+
+def test_fee_extractor_multi_byte_lengths():
+    # memo longer than 127 bytes: length (and enclosing body length) encoded as multi-byte varints
+    callback = CosmosTransactionFeeExtractor()
+    ProtobufParser(_cosmos_tx(b"ibc/" + b"A" * 200, b"123456789", memo=b"m" * 300), callback).parse()
+
+    assert (callback.fee_denom, callback.fee_amount) == ("ibc/" + "A" * 200, "123456789")
+
+
+def test_fee_extractor_no_fee():
+    callback = CosmosTransactionFeeExtractor()
+    ProtobufParser(_field_bytes(1, b"body"), callback).parse()
+
+    assert (callback.fee_denom, callback.fee_amount) == (None, None)
+
+
+def test_field_paths():
+    data = (
+        _field_varint(1, 150)
+        + _field_bytes(2, _field_bytes(1, b"abc") + _field_bytes(3, _field_varint(20, 300)) + _field_varint(4, 1))
+        + _field_bytes(5, b"xyz")
+    )
+    callback = Recorder(message_paths={(2,), (2, 3)})
+    ProtobufParser(data, callback).parse()
+
+    assert callback.events == [
+        (ProtobufWireType.VARINT, (1,), (150).to_bytes(2, "little")),
+        ("message", (2,)),
+        (ProtobufWireType.LENGTH_DELIMITED, (2, 1), b"abc"),
+        ("message", (2, 3)),
+        (ProtobufWireType.VARINT, (2, 3, 20), (300).to_bytes(2, "little")),
+        (ProtobufWireType.VARINT, (2, 4), b"\x01"),
+        (ProtobufWireType.LENGTH_DELIMITED, (5,), b"xyz"),
+    ]
+
+
+def test_field_paths_empty_message():
+    data = _field_bytes(1, _field_bytes(2, b"") + _field_varint(3, 1)) + _field_varint(4, 2)
+    callback = Recorder(message_paths={(1,), (1, 2)})
+    ProtobufParser(data, callback).parse()
+
+    assert callback.events == [
+        ("message", (1,)),
+        ("message", (1, 2)),
+        (ProtobufWireType.VARINT, (1, 3), b"\x01"),
+        (ProtobufWireType.VARINT, (4,), b"\x02"),
+    ]
+
+
+def test_fixed_width_fields():
+    data = _varint(1 << 3 | 1) + bytes(range(8)) + _varint(2 << 3 | 5) + bytes(range(4))
+    callback = Recorder(message_paths=set())
+    ProtobufParser(data, callback).parse()
+
+    assert callback.events == [
+        (ProtobufWireType.FIXED_64_BIT, (1,), bytes(range(8))),
+        (ProtobufWireType.FIXED_32_BIT, (2,), bytes(range(4))),
+    ]
+
+
+def test_skipped_fields():
+    data = _field_bytes(1, _field_varint(1, 5)) + _field_varint(2, 6)
+
+    class Skipper(Recorder):
+        def on_length_delimited_field(self, field_number, field_path):
+            return ProtobufParserMessageAction.SKIP
+
+    callback = Skipper(message_paths=set())
+    ProtobufParser(data, callback).parse()
+
+    assert callback.events == [(ProtobufWireType.VARINT, (2,), b"\x06")]
+
+
+@pytest.mark.parametrize("data", [
+    _field_bytes(1, b"abcdef")[:-2],  # truncated bytes
+    _varint(1 << 3 | 1) + bytes(4),  # truncated fixed 64 bit
+    _varint(1 << 3) + b"\x80",  # truncated varint
+])
+def test_truncated(data):
+    with pytest.raises(EOFError):
+        ProtobufParser(data, Recorder(message_paths=set())).parse()
+
+
+def test_truncated_skipped_field():
+    data = _field_bytes(1, b"abcdef")[:-2]
+
+    with pytest.raises(EOFError):
+        ProtobufParser(data, CosmosTransactionFeeExtractor()).parse()
+
+
+def test_group_wire_types_not_supported():
+    with pytest.raises(NotImplementedError):
+        ProtobufParser(_varint(1 << 3 | 3), Recorder(message_paths=set())).parse()
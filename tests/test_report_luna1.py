@@ -0,0 +1,125 @@
+import json
+import os
+
+import pytest
+import report_luna1
+from luna1.api_fcd import FcdAPI
+from luna1.config_luna1 import localconfig
+from luna1.txs_checkpoint import MAX_AGE_SECONDS, TxsCheckpoint
+
+WALLET = "terra1wallet"
+
+
+class FakeProgress:
+
+    def report(self, num, message, stage_name="default"):
+        pass
+
+    def report_message(self, message):
+        pass
+
+
+class FakeFcd:
+    """ Serves FcdAPI.get_txs() pages (offsets are the id of the last tx of the previous page) """
+
+    def __init__(self, num_txs, page_size, fail_at_query=None):
+        self.txs = [{"id": num_txs - i, "txhash": "tx{}".format(num_txs - i)} for i in range(num_txs)]
+        self.page_size = page_size
+        self.fail_at_query = fail_at_query
+        self.offsets = []
+
+    def get_txs(self, address, offset=None):
+        if self.fail_at_query is not None and len(self.offsets) == self.fail_at_query:
+            raise ConnectionError("fcd unavailable")
+        # Like FcdAPI.get_txs(), no offset (None or 0) means first page
+        offset = offset if offset else None
+        self.offsets.append(offset)
+
+        start = 0 if offset is None else [tx["id"] for tx in self.txs].index(offset) + 1
+        page = self.txs[start:start + self.page_size]
+        data = {"txs": [dict(tx) for tx in page]}
+        if start + self.page_size < len(self.txs):
+            data["next"] = page[-1]["id"]
+        return data
+
+
+@pytest.fixture
+def fcd(monkeypatch, tmp_path):
+    monkeypatch.setattr("luna1.txs_checkpoint.REPORTS_DIR", str(tmp_path))
+    monkeypatch.setattr(localconfig, "limit", 10000)
+    monkeypatch.setattr(FcdAPI, "stats", classmethod(lambda cls: {}))
+
+    def install(fake):
+        monkeypatch.setattr(FcdAPI, "get_txs", classmethod(lambda cls, *args, **kwargs: fake.get_txs(*args, **kwargs)))
+        return fake
+
+    return install
+
+
+def _txhashes(txs):
+    return [tx["txhash"] for tx in txs]
+
+
+def test_get_txs_all_pages(fcd):
+    fake = fcd(FakeFcd(num_txs=25, page_size=10))
+
+    txs = report_luna1._get_txs(WALLET, FakeProgress())
+
+    assert _txhashes(txs) == _txhashes(fake.txs)
+    assert fake.offsets == [None, 16, 6]
+    assert not os.path.exists(TxsCheckpoint(WALLET).path)
+
+
+def test_get_txs_resumes_after_interruption(fcd):
+    fake = fcd(FakeFcd(num_txs=25, page_size=10, fail_at_query=2))
+    with pytest.raises(ConnectionError):
+        report_luna1._get_txs(WALLET, FakeProgress())
+    assert os.path.exists(TxsCheckpoint(WALLET).path)
+
+    fake = fcd(FakeFcd(num_txs=25, page_size=10))
+    txs = report_luna1._get_txs(WALLET, FakeProgress())
+
+    # Only the remaining page is queried
+    assert fake.offsets == [6]
+    assert _txhashes(txs) == _txhashes(fake.txs)
+    assert not os.path.exists(TxsCheckpoint(WALLET).path)
+
+
+def test_get_txs_completed_checkpoint(fcd):
+    # Previous run fetched all pages, but was interrupted before removing checkpoint
+    checkpoint = TxsCheckpoint(WALLET)
+    pages = FakeFcd(num_txs=15, page_size=10)
+    checkpoint.add_page(pages.get_txs(WALLET)["txs"], 6)
+    checkpoint.add_page(pages.get_txs(WALLET, 6)["txs"], None)
+
+    fake = fcd(FakeFcd(num_txs=15, page_size=10))
+    txs = report_luna1._get_txs(WALLET, FakeProgress())
+
+    assert fake.offsets == []
+    assert _txhashes(txs) == _txhashes(fake.txs)
+
+
+def test_checkpoint_ignores_partial_last_line(fcd):
+    checkpoint = TxsCheckpoint(WALLET)
+    checkpoint.add_page([{"txhash": "tx1"}], 1)
+    with open(checkpoint.path, "a") as f:
+        f.write('{"time": 1, "next": 2, "txs": [{"txh')
+
+    assert checkpoint.load() == ([{"txhash": "tx1"}], 1, 1)
+
+
+def test_checkpoint_ignores_old_file(fcd):
+    checkpoint = TxsCheckpoint(WALLET)
+    checkpoint.add_page([{"txhash": "tx1"}], 1)
+    with open(checkpoint.path, "r") as f:
+        page = json.loads(f.readline())
+    page["time"] -= MAX_AGE_SECONDS + 1
+    with open(checkpoint.path, "w") as f:
+        f.write(json.dumps(page) + "\n")
+
+    assert checkpoint.load() == ([], 0, 0)
+
+    fake = fcd(FakeFcd(num_txs=5, page_size=10))
+    txs = report_luna1._get_txs(WALLET, FakeProgress())
+    assert fake.offsets == [None]
+    assert _txhashes(txs) == _txhashes(fake.txs)
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+import report_sol
+from sol.api_rpc import RpcAPI
+from sol.config_sol import localconfig
+from sol.sync_state import SyncState
+
+
+class FakeSignatures:
+    """ Serves getConfirmedSignaturesForAddress2 results (newest first) from a list of signatures per address """
+
+    def __init__(self, signatures, delays=None, not_finalized=()):
+        self.signatures = signatures
+        self.delays = delays if delays else {}
+        self.not_finalized = set(not_finalized)
+        self.lock = threading.Lock()
+        self.queries = []
+
+    def get_txids(self, wallet_address, limit=None, before=None, until=None):
+        with self.lock:
+            self.queries.append((wallet_address, before, until))
+        time.sleep(self.delays.get(wallet_address, 0))
+
+        signatures = self.signatures.get(wallet_address, [])
+        start = signatures.index(before) + 1 if before else 0
+        end = signatures.index(until) if until else len(signatures)
+        page = signatures[start:end][:limit]
+
+        return {"result": [
+            {
+                "signature": signature,
+                "blockTime": 1640000000,
+                "confirmationStatus": "confirmed" if signature in self.not_finalized else "finalized",
+            } for signature in page
+        ]}
+
+
+@pytest.fixture
+def fake_rpc(monkeypatch):
+    monkeypatch.setattr(localconfig, "limit", 10000)
+    monkeypatch.setattr(localconfig, "end_date", None)
+    monkeypatch.setattr(localconfig, "fetch_workers", 4)
+    monkeypatch.setattr(report_sol, "LIMIT_PER_QUERY", 2)
+
+    def install(signatures, **kwargs):
+        fake = FakeSignatures(signatures, **kwargs)
+        monkeypatch.setattr(RpcAPI, "_get_txids", classmethod(lambda cls, *args, **kw: fake.get_txids(*args, **kw)))
+        return fake
+
+    return install
+
+
+def test_query_txids_merges_addresses_oldest_first(fake_rpc):
+    # wallet's txs also show up under its token accounts; token account "b" is slowest to return
+    fake_rpc({
+        "wallet": ["w5", "w4", "w3", "w2", "w1"],
+        "a": ["a2", "w4", "a1"],
+        "b": ["b1", "w2"],
+    }, delays={"b": 0.05})
+
+    txids = report_sol._query_txids(["wallet", "a", "b"], None)
+
+    assert txids == ["b1", "a1", "a2", "w1", "w2", "w3", "w4", "w5"]
+
+
+def test_query_txids_incremental(fake_rpc):
+    state = SyncState("wallet", None, None)
+    state.high_water_marks = {"wallet": "w3", "a": "a1"}
+    state.txids = {"w1", "w2", "w3", "a1"}
+    fake = fake_rpc({
+        "wallet": ["w6", "w5", "w4", "w3", "w2", "w1"],
+        "a": ["a1"],
+        "b": ["b2", "w5", "b1"],
+    })
+
+    txids = report_sol._query_txids(["wallet", "a", "b"], None, state=state)
+
+    assert txids == ["b1", "b2", "w4", "w5", "w6"]
+    # Queries start from high water marks
+    assert ("wallet", None, "w3") in fake.queries
+    assert ("a", None, "a1") in fake.queries
+    assert ("b", None, None) in fake.queries
+    # Address without new txids keeps its high water mark
+    assert state.high_water_marks == {"wallet": "w6", "a": "a1", "b": "b2"}
+
+    # Second run with no new txids returns nothing, and leaves high water marks unchanged
+    txids = report_sol._query_txids(["wallet", "a", "b"], None, state=state)
+    assert txids == []
+    assert state.high_water_marks == {"wallet": "w6", "a": "a1", "b": "b2"}
+
+
+def test_query_txids_incremental_skips_unfinalized(fake_rpc):
+    state = SyncState("wallet", None, None)
+    state.high_water_marks = {"wallet": "w1"}
+    fake_rpc({"wallet": ["w3", "w2", "w1"]}, not_finalized={"w3"})
+
+    txids = report_sol._query_txids(["wallet"], None, state=state)
+
+    # w3 is not finalized yet: not returned, and high water mark stops before it so that next run picks it up
+    assert txids == ["w2"]
+    assert state.high_water_marks == {"wallet": "w2"}
+
+
+def test_sync_state_save_load(monkeypatch, tmp_path):
+    monkeypatch.setattr("sol.sync_state.REPORTS_DIR", str(tmp_path))
+    state = SyncState("wallet", "2022-01-01", None)
+    state.high_water_marks = {"wallet": "w2", "a": "a1"}
+    state.txids = {"w1", "w2", "a1"}
+    state.staking_addresses = {"stake1"}
+    state.save()
+
+    loaded = SyncState.load("wallet", "2022-01-01", None)
+    assert loaded.high_water_marks == state.high_water_marks
+    assert loaded.txids == state.txids
+    assert loaded.staking_addresses == state.staking_addresses
+
+    # Different date range: previous state is ignored
+    loaded = SyncState.load("wallet", "2021-01-01", None)
+    assert loaded.high_water_marks == {}
+    assert loaded.txids == set()
@@ -0,0 +1,71 @@
+import pytest
+from sol.api_rpc import RpcAPI
+from sol.block_times import SLOT_TOLERANCE, SLOTS_PER_PROBE, BlockTimeDB
+
+LATEST_SLOT = 150000000
+LATEST_TS = 1660000000
+
+
+def _block_time(slot):
+    # ~0.55 seconds per slot; every 7th slot skipped (no block time)
+    if slot % 7 == 0 or slot > LATEST_SLOT:
+        return None
+    return LATEST_TS - int((LATEST_SLOT - slot) * 0.55)
+
+
+@pytest.fixture
+def chain(monkeypatch, tmp_path):
+    monkeypatch.setattr(BlockTimeDB, "path", str(tmp_path / "block_times.db"))
+    monkeypatch.setattr(BlockTimeDB, "conn", None)
+    queried = []
+
+    def get_block_times(cls, slots):
+        queried.extend(slots)
+        return {int(slot): _block_time(int(slot)) for slot in slots}
+
+    monkeypatch.setattr(RpcAPI, "get_slot", classmethod(lambda cls: LATEST_SLOT))
+    monkeypatch.setattr(RpcAPI, "get_block_times", classmethod(get_block_times))
+    return queried
+
+
+def _first_slot_at_or_after(ts):
+    # Inverse of _block_time(), then step over skipped slots
+    slot = LATEST_SLOT - int((LATEST_TS - ts) / 0.55) - 2
+    while _block_time(slot) is None or _block_time(slot) < ts:
+        slot += 1
+    return slot
+
+
+def _assert_found(slot, ts):
+    assert _block_time(slot) >= ts
+    assert slot - _first_slot_at_or_after(ts) <= SLOT_TOLERANCE + SLOTS_PER_PROBE
+
+
+def test_estimate(chain):
+    BlockTimeDB.add_many({1000: 5000, 2000: 6000})
+
+    assert BlockTimeDB.estimate(1000) == 5000
+    assert BlockTimeDB.estimate(1500) == 5500
+    assert BlockTimeDB.estimate(999) is None
+    assert BlockTimeDB.estimate(2001) is None
+
+
+@pytest.mark.parametrize("days", [1, 30, 200])
+def test_find_slot(chain, days):
+    ts = LATEST_TS - days * 86400
+    _assert_found(BlockTimeDB.find_slot(ts), ts)
+
+
+def test_find_slot_future(chain):
+    assert BlockTimeDB.find_slot(LATEST_TS + 100) is None
+
+
+def test_find_slot_uses_stored_block_times(chain):
+    ts = LATEST_TS - 30 * 86400
+    BlockTimeDB.find_slot(ts)
+    num_queried = len(chain)
+
+    # Stored block times around ts from previous searches narrow the next search
+    chain.clear()
+    _assert_found(BlockTimeDB.find_slot(ts + 3600), ts + 3600)
+    assert len(chain) < num_queried
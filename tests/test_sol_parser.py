@@ -0,0 +1,36 @@
+import json
+import os
+
+import pytest
+import sol.api_rpc
+from sol.parser import parse_tx
+from sol.TxInfoSol import WalletInfo
+
+# Recorded-format transactions (synthetic accounts, real token list mints), with TxInfoSol fields produced by the
+# parser before it was reworked to build account/mint tables once per transaction.
+PATH_DATA = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data", "sol_parse_tx.json")
+FIELDS = ["timestamp", "fee", "fee_blockchain", "instruction_types", "program_ids", "input_accounts",
+          "wallet_accounts", "account_to_mint", "mints", "balance_changes_all", "balance_changes_wallet",
+          "transfers", "transfers_net"]
+
+with open(PATH_DATA, "r") as f:
+    DATA = json.load(f)
+
+
+def _default(obj):
+    if isinstance(obj, set):
+        return sorted(obj)
+    raise TypeError(type(obj))
+
+
+@pytest.mark.parametrize("txid,data", DATA["txs"], ids=[txid for txid, _ in DATA["txs"]])
+def test_parse_tx_matches_recorded_output(monkeypatch, txid, data):
+    wallet_address = DATA["wallet_address"]
+    monkeypatch.setitem(sol.api_rpc.TOKEN_ACCOUNTS, wallet_address, DATA["token_accounts"])
+    wallet_info = WalletInfo(wallet_address)
+
+    txinfo = parse_tx(txid, data, wallet_info)
+
+    out = json.loads(json.dumps({field: getattr(txinfo, field) for field in FIELDS}, default=_default))
+    out["staking_addresses"] = sorted(wallet_info.get_staking_addresses())
+    assert out == DATA["expected"][txid]